@@ -1,17 +1,89 @@
 import numpy as np
+import multiprocessing
+import os
+import pickle
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
 
 from Circuit import ComponentsHandlerC
+from Netlist import StartTruthTableWorker, ComputeTruthTableChunk
 from Storage import FileSavedEntityC, StorageItem
 
-from Values import PinDict
+from Values import PinDict, Params
 from Console import Log, LogWarning, LogSuccess
 
 class TruthTableC(StorageItem):
     LibRef = "TruthTable"
+    Valid = None # Missing from tables saved without outputs validity
+    InputValid = None
     def __init__(self):
-        self.StoredAttribute('Data', np.zeros(0, dtype = int))
+        self.StoredAttribute('Data', np.zeros(0, dtype = np.uint8))
+        self.StoredAttribute('Valid', np.zeros(0, dtype = np.uint8)) # Outputs validity bits, stored next to the outputs levels bits
+        self.StoredAttribute('InputValid', 0) # Inputs validity word. It does not depend on the input word, only on the nets driven by the input pins
+        self.StoredAttribute('NBitsOutput', 0)
         self.StoredAttribute('UpToDate', False)
 
+    def Start(self):
+        if self.Valid is None or self.InputValid is None: # Recomputed at next request
+            self.UpToDate = False
+
+    def Set(self, Data, Valid, InputValid, NBitsOutput):
+        DType = np.min_scalar_type((1 << NBitsOutput) - 1) # Smallest unsigned type fitting the output width
+        self.Data = np.asarray(Data).astype(DType)
+        self.Valid = np.asarray(Valid).astype(DType)
+        self.InputValid = int(InputValid)
+        self.NBitsOutput = NBitsOutput
+        self.UpToDate = True
+
+    def Evaluate(self, Input):
+        return int(self.Data[Input])
+    def EvaluateValid(self, Input):
+        return int(self.Valid[Input])
+    def EvaluateLevels(self, Input): # Output pins levels, using the little-endian norm. Invalid outputs hold their Undef or Multiple level
+        Output, Valid = int(self.Data[Input]), int(self.Valid[Input])
+        return [(((~Valid >> nPin) & 0b1) << 1) | ((Output >> nPin) & 0b1) for nPin in range(self.NBitsOutput)]
+    def EvaluateBatch(self, Inputs):
+        return self.Data[Inputs].astype(np.int64), self.Valid[Inputs].astype(np.int64)
+    def RunBatch(self, Inputs): # Same results as BoardC.RunBatch
+        Outputs, OutputValid = self.EvaluateBatch(Inputs)
+        return Outputs, np.full(Inputs.shape[0], self.InputValid, dtype = np.int64), OutputValid
+
+class RunCacheC: # Bounded memo of a board outputs by input word, evicting the least recently used words
+    def __init__(self, Size):
+        self.Size = Size
+        self.Data = OrderedDict()
+        self.Hits = 0
+        self.Misses = 0
+
+    def Get(self, Input):
+        if Input in self.Data:
+            self.Hits += 1
+            self.Data.move_to_end(Input)
+            return self.Data[Input]
+        self.Misses += 1
+        return None
+    def Set(self, Input, Output):
+        if self.Size <= 0:
+            return
+        self.Data[Input] = Output
+        if len(self.Data) > self.Size:
+            self.Data.popitem(last = False)
+    def Clear(self):
+        self.Data.clear()
+
+    def __repr__(self):
+        return f"Run cache ({len(self.Data)}/{self.Size} words, {self.Hits} hits, {self.Misses} misses)"
+
+class LogProgress: # Default truth table progress, logged every tenth of the inputs
+    def __init__(self):
+        self.Logged = 0
+    def __call__(self, Done, Total):
+        if Total > Params.Board.LanesBlockSize and 10 * Done >= (self.Logged + 1) * Total:
+            self.Logged = 10 * Done // Total
+            Log(f"Truth table: {Done}/{Total} inputs")
+        return False
+
 class BoardGroupsHandlerC(StorageItem):
     LibRef = "BoardGroupsHandlerC"
     NoneBoardGroupID = (PinDict.NoneBoardGroupName, None)
@@ -59,6 +131,8 @@ class BoardC(FileSavedEntityC):
     LibRef = "BoardC"
     Untitled = "Untitled"
     Display = None
+    _RunCache = None
+    _BatchDepth = 0
     def __init__(self, Filename = None, Display = None, ParentBoard = None):
         self.StoredAttribute('ComponentsHandler', ComponentsHandlerC())
         self.StoredAttribute('TruthTable', TruthTableC())
@@ -73,16 +147,20 @@ class BoardC(FileSavedEntityC):
         self._LiveUpdate = True
 
         self.Display = Display
-        self.Display.Board = self
+        if self.Displayed:
+            self.Display.Board = self
         if self.Filed:
             FileSavedEntityC.Load(self)
+            if Params.Board.FlattenHierarchy: # The whole hierarchy is compiled once at load
+                self.ComponentsHandler.Compile()
         
         self.ComponentsHandler.BoardGroupsHandler = self.BoardGroupsHandler
-        self.Display.SetView()
+        if self.Displayed:
+            self.Display.SetView()
 
     @property
     def Displayed(self):
-        return self.Display is None
+        return not self.Display is None
 
     def Save(self, Filename, Force = False):
         if self.Saved and not Force:
@@ -94,31 +172,112 @@ class BoardC(FileSavedEntityC):
         self.Name = Filename.split('/')[-1].split('.')[0]
 
         return FileSavedEntityC.Save(self)
+    def HeaderCounts(self):
+        return len(self.ComponentsHandler.Components), len(self.ComponentsHandler.Groups), self.NBitsInput, self.NBitsOutput
+    def HeaderSignature(self):
+        return tuple((Pin.Type, Pin.Name) for Pin in self.Pins)
+
+    @property
+    def RunCache(self): # Created on demand, as boards loaded as components do not go through __init__
+        if self._RunCache is None:
+            self._RunCache = RunCacheC(Params.Board.RunCacheSize)
+        return self._RunCache
 
     def Run(self, Input):
         if self.TruthTable.UpToDate and not self.Displayed:
             return self.TruthTable.Evaluate(Input)
-        else:
-            self.Input = Input
-            self.ComponentsHandler.SolveRequests()
-            return self.Output
+        self.Input = Input
+        self.ComponentsHandler.SolveRequests()
+        return self.Output
 
-    def ComputeTruthTable(self):
-        StoredInput = self.Input
+    def EvaluateLevels(self, Input): # Output pins levels for an input word, as seen by casings running this board. Invalid outputs hold their Undef or Multiple level
+        # Answers from the truth table or the run cache leave the levels inside the board untouched. Use Run to set the board input
+        if self.TruthTable.UpToDate and not self.Displayed:
+            return self.TruthTable.EvaluateLevels(Input)
+        Cached = not self.Displayed and self.ComponentsHandler.Ready and self.ComponentsHandler.Netlist.Acyclic # Boards with loops can hold a state, their outputs do not only depend on the input word
+        if Cached:
+            OutputLevels = self.RunCache.Get(Input)
+            if not OutputLevels is None:
+                return OutputLevels
+        self.Input = Input
+        self.ComponentsHandler.SolveRequests()
+        OutputLevels = tuple(self.OutputLevels)
+        if Cached:
+            self.RunCache.Set(Input, OutputLevels)
+        return OutputLevels
 
-        N = 2**self.NBitsInput
-        Data = np.zeros(N, dtype = int)
-        self.ComponentsHandler.Ready = False
-        for Input in range(N):
-            self.Input = Input
-            self.ComponentsHandler.SolveRequests()
-            Data[Input] = self.Output
-        self.TruthTable.Data = Data
-        self.TruthTable.UpToDate = True
+    def RunBatch(self, Inputs): # Evaluates an array of input words at once. Returns the output words, with the inputs and outputs validities
+        Inputs = np.asarray(Inputs, dtype = np.int64)
+        if self.TruthTable.UpToDate and not self.Displayed:
+            return self.TruthTable.RunBatch(Inputs)
+        return self.SimulateBatch(Inputs)
+
+    def SimulateBatch(self, Inputs):
+        Netlist = self.ComponentsHandler.Netlist
+        Results = Netlist.RunBatch(Inputs)
+        if self.Displayed and not Netlist.Acyclic: # Levels changed while applying the inputs are written back with the restored state
+            Netlist.Sync()
+        return Results
+    @property
+    def Evaluator(self): # Picklable stand-in used by the netlist of a parent board sent to truth table workers : the truth table when up to date, else the compiled netlist
+        if self.TruthTable.UpToDate:
+            return self.TruthTable
+        return self.ComponentsHandler.Netlist
+
+    def ComputeTruthTable(self, Jobs = None, Progress = None): # Progress(Done, Total) is called after each chunk of inputs, and cancels the computation when returning True. Returns False if cancelled
+        NInputs = 2**self.NBitsInput
+        if Jobs is None:
+            Jobs = Params.Board.TruthTableJobs
+        if Jobs == 0:
+            Jobs = os.cpu_count() or 1
+        if Progress is None:
+            Progress = LogProgress()
+        DType = np.min_scalar_type((1 << self.NBitsOutput) - 1)
+        Chunk = Params.Board.LanesBlockSize
+        Chunks = [(Start, min(NInputs, Start + Chunk)) for Start in range(0, NInputs, Chunk)]
+        Parallel = Jobs > 1 and len(Chunks) > 1 and self.NBitsInput >= Params.Board.TruthTableParallelNBits
+        Arrays = np.zeros((2, NInputs), dtype = DType)
+        Cancelled = False
+        if Parallel: # Workers are started fresh rather than forked, as forking a process running Tk is unsafe. They only receive the compiled netlist
+            if not self.ComponentsHandler.Compiled:
+                self.ComponentsHandler.Compile()
+            Pickled = pickle.dumps(self.ComponentsHandler.Netlist)
+            Task = Chunk * max(1, Params.Board.TruthTableTaskBlocks)
+            Tasks = [(Start, min(NInputs, Start + Task)) for Start in range(0, NInputs, Task)]
+            Context = multiprocessing.get_context('forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
+            Stop = Context.Event()
+            with ProcessPoolExecutor(min(Jobs, len(Tasks)), mp_context = Context, initializer = StartTruthTableWorker, initargs = (Pickled, Stop)) as Executor:
+                Futures = [Executor.submit(ComputeTruthTableChunk, Start, End) for Start, End in Tasks]
+                try:
+                    Done = 0
+                    for Future in as_completed(Futures):
+                        Start, Data, Valid = Future.result()
+                        Arrays[0, Start:Start+Data.shape[0]], Arrays[1, Start:Start+Data.shape[0]] = Data, Valid
+                        Done += Data.shape[0]
+                        if Progress(Done, NInputs):
+                            Cancelled = True
+                            break
+                except KeyboardInterrupt:
+                    Cancelled = True
+                if Cancelled: # Pending tasks are dropped, and running ones stop at their next block
+                    Stop.set()
+                    Executor.shutdown(cancel_futures = True)
+        else:
+            try:
+                for Start, End in Chunks:
+                    Data, _, Valid = self.SimulateBatch(np.arange(Start, End, dtype = np.int64))
+                    Arrays[0, Start:End], Arrays[1, Start:End] = Data, Valid
+                    if Progress(End, NInputs):
+                        Cancelled = True
+                        break
+            except KeyboardInterrupt:
+                Cancelled = True
+        if Cancelled:
+            LogWarning("Truth table computation cancelled")
+            return False
+        self.TruthTable.Set(Arrays[0], Arrays[1], self.ComponentsHandler.Netlist.InputValid, self.NBitsOutput)
         Log("Done!")
-        self.Input = StoredInput
-        self.ComponentsHandler.SolveRequests()
-        self.ComponentsHandler.Ready = True
+        return True
 
     @property
     def Filed(self):
@@ -138,15 +297,40 @@ class BoardC(FileSavedEntityC):
             self.ComponentsHandler.SolveRequests()
     def Building(func):
         def WrapBuild(self, *args, **kwargs):
-            self.ComponentsHandler.Ready = False
-            self.ComponentsHandler._Saved = False
-            self.TruthTable.UpToDate = False
+            if self.Batching: # Board is settled once, when the outermost batch ends
+                return func(self, *args, **kwargs)
+            self.StartBuild()
             output = func(self, *args, **kwargs)
-            if self.LiveUpdate:
-                self.ComponentsHandler.SolveRequests()
-            self.ComponentsHandler.Ready = True
+            self.EndBuild()
             return output
         return WrapBuild
+    def StartBuild(self):
+        self.ComponentsHandler.Ready = False
+        self.ComponentsHandler._Saved = False
+        self.TruthTable.UpToDate = False
+        self.RunCache.Clear()
+    def EndBuild(self):
+        if self.LiveUpdate:
+            self.ComponentsHandler.SolveRequests()
+        self.ComponentsHandler.Ready = True
+
+    @property
+    def Batching(self):
+        return self._BatchDepth > 0
+    @contextmanager
+    def Batch(self): # Groups edits, with groups merges and levels changes deferred to the end of the batch, where they are applied once and the board is settled once. Batches can be nested
+        if not self.Batching:
+            self.StartBuild()
+            self.ComponentsHandler.DeferMerges()
+        self._BatchDepth += 1
+        try:
+            yield self
+        finally:
+            self._BatchDepth -= 1
+            if not self.Batching:
+                self.ComponentsHandler.ApplyMerges()
+                self.ComponentsHandler.Levelize()
+                self.EndBuild()
 
     @property
     def NBitsInput(self):
@@ -173,7 +357,12 @@ class BoardC(FileSavedEntityC):
     def OutputGroups(self):
         return self.BoardGroupsHandler.OutputGroups
     @property
+    def Simulated(self): # True when levels are held by the compiled netlist rather than by the components
+        return self.ComponentsHandler.Compiled
+    @property
     def Input(self):
+        if self.Simulated:
+            return self.ComponentsHandler.Netlist.Input
         Input = 0
         for Pin in reversed(self.ComponentsHandler.InputPins): # Use of little-endian norm
             Input = (Input << 1) | (Pin.Level & 0b1)
@@ -181,23 +370,40 @@ class BoardC(FileSavedEntityC):
     @Input.setter
     def Input(self, Input):
         self.ComponentsHandler._Saved = False
+        if self.ComponentsHandler.Ready and (self.Simulated or not self.Displayed): # Settled board, evaluated through its compiled netlist. Displayed boards are not compiled again after each edit, and are evaluated through their components until a batch evaluation needs the netlist
+            Netlist = self.ComponentsHandler.Netlist
+            Netlist.SetInput(Input)
+            if self.Displayed:
+                Netlist.Sync()
+            return
         for Pin in self.ComponentsHandler.InputPins:
-            Pin.BoardInputSetLevel(Input & 0b1, ['BoardInput'])
+            Pin.BoardInputSetLevel(Input & 0b1)
             Input = Input >> 1
     @property
     def Output(self):
+        if self.Simulated:
+            return self.ComponentsHandler.Netlist.Output
         Output = 0
         for Pin in reversed(self.ComponentsHandler.OutputPins): # Use of little-endian norm
             Output = (Output << 1) | (Pin.Level & 0b1)
         return Output
     @property
+    def OutputLevels(self):
+        if self.Simulated:
+            return self.ComponentsHandler.Netlist.OutputLevels
+        return [Pin.Level for Pin in self.OutputPins]
+    @property
     def InputValid(self):
+        if self.Simulated:
+            return self.ComponentsHandler.Netlist.InputValid
         Valid = 0
         for Pin in reversed(self.InputPins):
             Valid = (Valid << 1) | (Pin.Valid)
         return Valid
     @property
     def OutputValid(self):
+        if self.Simulated:
+            return self.ComponentsHandler.Netlist.OutputValid
         Valid = 0
         for Pin in reversed(self.OutputPins):
             Valid = (Valid << 1) | (Pin.Valid)
@@ -213,7 +419,9 @@ class BoardC(FileSavedEntityC):
     @Building
     def ToggleConnexion(self, *args, **kwargs):
         return self.ComponentsHandler.ToggleConnexion(*args, **kwargs)
-    def SetPinIndex(self, *args, **kwargs):
+    def SetPinIndex(self, *args, **kwargs): # Input and output words are read in pins order
+        self.TruthTable.UpToDate = False
+        self.RunCache.Clear()
         return self.ComponentsHandler.SetPinIndex(*args, **kwargs)
     def HasItem(self, *args, **kwargs):
         return self.ComponentsHandler.HasItem(*args, **kwargs)
@@ -0,0 +1,94 @@
+import numpy as np
+
+from Library import StandardBook # Library must be imported before Board and Components, as it resolves their circular imports
+from Board import BoardC
+import Components as ComponentsModule
+
+from Values import PinDict
+from Console import LogWarning
+
+# Places components on a board from coordinates, without any plotting objects. Allows to generate large circuits from scripts, e.g.
+#     Builder = BoardBuilderC()
+#     with Builder.Batch():
+#         Builder.Casings('And', [(0, 0), (0, 10)])
+#         Builder.Wire((-5, 0), (-5, 10))
+
+class BoardBuilderC:
+    HeadlessClasses = {}
+    def __init__(self, Board = None):
+        if Board is None:
+            Board = BoardC()
+        self.Board = Board
+
+    def Batch(self): # Board is only settled once all components of the batch are placed
+        return self.Board.Batch()
+
+    @classmethod
+    def Class(cls, CClass): # Accepts a component class or the name of a standard component. Returns a class that creates no plot
+        if isinstance(CClass, str):
+            if not CClass in StandardBook:
+                raise ValueError(f"No component named {CClass} in {StandardBook}")
+            CClass = StandardBook.CClasses[CClass]
+        if CClass.Display is None:
+            return CClass
+        if not CClass in cls.HeadlessClasses: # Same as display transmission for casing pins
+            cls.HeadlessClasses[CClass] = type(CClass.__name__, (CClass, ), {'Display':None})
+        return cls.HeadlessClasses[CClass]
+
+    def Place(self, Component):
+        if not self.Board.Register(Component):
+            raise ValueError(f"Unable to place {Component} at {Component.Location.tolist()}")
+        return Component
+
+    def Casing(self, CClass, Location, Rotation = 0, Symmetric = False):
+        return self.Place(self.Class(CClass)(np.array(Location, dtype = int), Rotation, Symmetric))
+    def Casings(self, CClass, Locations, Rotations = 0, Symmetric = False): # Locations is an (N, 2) array, rotations and symmetries a scalar or an N array
+        CClass = self.Class(CClass)
+        Locations = np.asarray(Locations, dtype = int).reshape(-1, 2)
+        Rotations = np.broadcast_to(Rotations, Locations.shape[0]).tolist()
+        Symmetric = np.broadcast_to(Symmetric, Locations.shape[0]).tolist()
+        with self.Batch():
+            return [self.Place(CClass(Location, Rotation, Sym)) for Location, Rotation, Sym in zip(Locations, Rotations, Symmetric)]
+
+    def Wire(self, Start, End): # Wires are straight, either horizontal, vertical or diagonal
+        Start, End = np.array(Start, dtype = int), np.array(End, dtype = int)
+        dx, dy = End - Start
+        if (dx == 0 and dy == 0) or not (dx == 0 or dy == 0 or abs(dx) == abs(dy)):
+            raise ValueError(f"Cannot place a wire from {Start.tolist()} to {End.tolist()}")
+        Wire = self.Class(ComponentsModule.WireC)(Start, 0, False)
+        Wire.WireChild = None # No building segment for placed wires
+        Wire.Location = (Start, End)
+        return self.Place(Wire)
+    def Wires(self, Starts, Ends): # Starts and Ends are (N, 2) arrays
+        Starts = np.asarray(Starts, dtype = int).reshape(-1, 2)
+        Ends = np.asarray(Ends, dtype = int).reshape(-1, 2)
+        with self.Batch():
+            return [self.Wire(Start, End) for Start, End in zip(Starts, Ends)]
+    def Path(self, Points): # Wires joining consecutive points
+        Points = np.asarray(Points, dtype = int).reshape(-1, 2)
+        return self.Wires(Points[:-1], Points[1:])
+
+    def Pin(self, Location, Type = PinDict.Input, Rotation = 0, Name = ''):
+        Pin = self.Place(self.Class(ComponentsModule.BoardPinC)(np.array(Location, dtype = int), Rotation, Type))
+        if Name:
+            Pin.Name = Name
+        return Pin
+    def Pins(self, Locations, Type = PinDict.Input, Rotations = 0, Names = None): # Pins are indexed in the order given
+        Locations = np.asarray(Locations, dtype = int).reshape(-1, 2)
+        Types = np.broadcast_to(Type, Locations.shape[0]).tolist()
+        Rotations = np.broadcast_to(Rotations, Locations.shape[0]).tolist()
+        if Names is None:
+            Names = ['' for _ in range(Locations.shape[0])]
+        with self.Batch():
+            return [self.Pin(Location, PinType, Rotation, Name) for Location, PinType, Rotation, Name in zip(Locations, Types, Rotations, Names)]
+
+    def Connexion(self, Location): # Joins the wires crossing at this location
+        x, y = Location
+        if self.Board.ComponentsHandler.Map.Get(x, y, -1):
+            LogWarning(f"Connexion already exists at {x, y}")
+            return
+        self.Board.ToggleConnexion(np.array(Location, dtype = int))
+    def Connexions(self, Locations):
+        with self.Batch():
+            for Location in np.asarray(Locations, dtype = int).reshape(-1, 2):
+                self.Connexion(Location)
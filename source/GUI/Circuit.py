@@ -1,9 +1,13 @@
 import numpy as np
+import heapq
+from collections import deque
 
 import Components as ComponentsModule
 from Values import Colors, Params, Levels, PinDict
 from Console import Log, LogSuccess, LogWarning, LogError
 from Storage import StorageItem
+from Netlist import NetlistC, SettleStatsC
+from Map import NewMap
 
 class ComponentsHandlerC(StorageItem):
     LibRef = "ComponentsHandler"
@@ -21,40 +25,102 @@ class ComponentsHandlerC(StorageItem):
         self.Start()
 
     def Start(self):
-        self.Map = np.zeros((Params.Board.Size, Params.Board.Size, 9), dtype = int)
+        self.Map = NewMap()
         for Component in self.Components.values():
             self.RegisterMap(Component)
 
         self.Ready = True
-        self.AwaitingUpdates = set()
+        self.AwaitingUpdates = UpdatesQueueC()
+        self.Solving = False
+        self.Levelized = False
+        self.Ranks = None
+        self._Netlist = None
+        self.PendingMerges = None # Links whose groups merges are deferred to the end of a batch, see DeferMerges
+
+    @property
+    def Netlist(self): # Compiled on demand, only valid for a settled board
+        if self._Netlist is None:
+            self.Compile()
+        return self._Netlist
+    @property
+    def Compiled(self):
+        return not self._Netlist is None
+    def Compile(self):
+        self._Netlist = NetlistC(self)
+        return self._Netlist
+    def Invalidate(self): # Must be called before any structural modification. Levels computed by the netlist are written back first so that objects are up to date
+        self.Levelized = False
+        self.Ranks = None
+        self.AwaitingUpdates.SetRanks(None)
+        if self._Netlist is None:
+            return
+        self._Netlist.Sync()
+        self._Netlist = None
 
     def ComputeChain(self):
         Log("Updating chain")
 
-    def CallRequest(self, Component, Backtrace = None):
-        if Backtrace is None:
-            Backtrace = []
-        else:
-            if Component in Backtrace:
-                LogWarning(f"{Component} entered an unstable recursive loop involving {Backtrace}")
-                return
+    def Levelize(self): # Ranks casings so that each one comes after the casings driving its inputs. Ranks is left to None if the board contains a loop
+        self.Levelized = True
+        self.Ranks = None
+        Readers = {Group:{Component.Parent for Component in Group.Components if Component.TriggersParent} for Group in self.Groups.values()}
+        NDrivers = {Casing:0 for Casing in self.Casings}
+        Successors = {}
+        for Casing in self.Casings:
+            Successors[Casing] = set()
+            for Pin in Casing.OutputPins:
+                Successors[Casing].update(Readers.get(Pin.Group, ()))
+            Successors[Casing].intersection_update(NDrivers)
+            for Successor in Successors[Casing]:
+                NDrivers[Successor] += 1
+        Ranks = {}
+        Rank = 0
+        Current = [Casing for Casing, N in NDrivers.items() if N == 0]
+        while Current:
+            Next = []
+            for Casing in Current:
+                Ranks[Casing] = Rank
+                for Successor in Successors[Casing]:
+                    NDrivers[Successor] -= 1
+                    if NDrivers[Successor] == 0:
+                        Next.append(Successor)
+            Current = Next
+            Rank += 1
+        if len(Ranks) == len(self.Casings):
+            self.Ranks = Ranks
+        self.AwaitingUpdates.SetRanks(self.Ranks)
+        return self.Ranks
+
+    def CallRequest(self, Component):
+        if not isinstance(Component, ComponentsModule.CasedComponentC): # Only casings are evaluated
+            return
+        self.AwaitingUpdates.Push(Component)
         if self.Ready:
-            Component(list(Backtrace))
-        else:
-            self.AwaitingUpdates.add((Component, tuple(Backtrace)))
-
-    def SolveRequests(self):
+            self.SolveRequests()
+
+    def SolveRequests(self): # Evaluates dirty casings until the board settles, and returns the statistics of the work done
+        # Ranks are only computed at the end of a batch, see BoardC.Batch. Single edits drop them, and are then settled in FIFO order, so that each edit does not levelize the whole board
+        if self.Solving:
+            return None
+        self.Solving = True
+        MaxEvaluations = Params.Board.MaxSettlePasses * max(1, len(self.Casings))
         while self.AwaitingUpdates:
-            Component, Backtrace = self.AwaitingUpdates.pop()
+            Component = self.AwaitingUpdates.Pop()
+            if self.AwaitingUpdates.Stats.Evaluations > MaxEvaluations:
+                LogWarning(f"Board did not settle after {MaxEvaluations} evaluations, {Component} is likely part of an unstable loop")
+                self.AwaitingUpdates.Clear()
+                break
             try:
-                Component(list(Backtrace))
+                Component()
             except Exception as e:
                 print(f"Requests solve error for component {Component} of group {Component.Group}:")
                 print(f"Exception : {e}")
-                print(Backtrace)
-                return
+                break
+        self.Solving = False
+        return self.AwaitingUpdates.EndSettle()
 
     def Register(self, NewComponent):
+        self.Invalidate()
         if not NewComponent.CanFix:
             return False
         if not self.CheckRoom(NewComponent):
@@ -73,10 +139,11 @@ class ComponentsHandlerC(StorageItem):
         self.SetComponent(NewComponent)
         NewComponent.Fix()
 
-        self.CallRequest(NewComponent, Backtrace = ['Register'])    
+        self.CallRequest(NewComponent)    
         return True
 
     def Remove(self, Components):
+        self.Invalidate()
         Components = {Component for Component in Components if not isinstance(Component, ComponentsModule.ConnexionC)}
         print(f"Attempting to remove {Components}")
         self.UnsetComponents(Components)
@@ -86,7 +153,7 @@ class ComponentsHandlerC(StorageItem):
 
     def CheckRoom(self, NewComponent):
         NewLocations = NewComponent.AdvertisedLocations
-        IDs = self.Map[NewLocations[:,0], NewLocations[:,1], NewLocations[:,2]]
+        IDs = self.Map.Gather(NewLocations)
         return (IDs == 0).all() # TODO : Ask for wire bridges
             #LogWarning(f"Unable to register the new component, due to positions {NewLocations[np.where(IDs != 0), :].tolist()}")
 
@@ -106,6 +173,8 @@ class ComponentsHandlerC(StorageItem):
             self.AddBoardPin(Component)
 
     def UnsetComponents(self, InputComponents):
+        if not self.PendingMerges is None: # Groups are split from their actual components
+            self.ApplyMerges(Stop = False)
         InputComponents = set(InputComponents)
         Components = set()
         while InputComponents: # Incase of children nesting
@@ -116,24 +185,58 @@ class ComponentsHandlerC(StorageItem):
                     InputComponents.add(Child)
         
         AffectedConnexions = self.GetConnexions(Components)
+        Neighbours = set() # Remaining components that were linked to removed ones. Groups can only split around them
         for Component in Components:
             for LinkedComponent in set(Component.Links):
+                Neighbours.add(LinkedComponent)
                 self.Unlink(Component, LinkedComponent)
             self.UnregisterMap(Component)
+        Neighbours.difference_update(Components)
         while Components:
             Component = Components.pop()
             Group = Component.Group
             if not Group is None: 
                 GroupComponents = {Component}.union(Components.intersection(Group.Components))
                 Components.difference_update(GroupComponents)
-                Group.Split(GroupComponents)
+                Group.Split(GroupComponents, {Neighbour for Neighbour in Neighbours if Neighbour.Group is Group})
             if isinstance(Component, ComponentsModule.BoardPinC):
                 self.RemoveBoardPin(Component)
         for Connexion in AffectedConnexions:
-            Connexion.UpdateColumn(self.Map[Connexion.Location[0], Connexion.Location[1], :])
+            Connexion.UpdateColumn(self.Map.Column(Connexion.Location[0], Connexion.Location[1]))
             if Connexion.ShouldBeRemoved:
                 self.RemoveConnexion(Connexion)
 
+    def DeferMerges(self): # Links made from now on only record the groups to merge. They are merged at once by ApplyMerges
+        if self.PendingMerges is None:
+            self.PendingMerges = []
+    def ApplyMerges(self, Stop = True): # Each set of linked groups is absorbed into its largest group, so that levels are resolved and components triggered once per resulting group
+        if not self.PendingMerges:
+            if Stop:
+                self.PendingMerges = None
+            return
+        Pending = self.PendingMerges
+        self.PendingMerges = None if Stop else []
+        Parents = {} # Union-find over groups, roots have no entry
+        def Find(Group):
+            Root = Group
+            while Root in Parents:
+                Root = Parents[Root]
+            while Group in Parents and not Parents[Group] is Root:
+                Parents[Group], Group = Root, Parents[Group]
+            return Root
+        for C1, C2 in Pending:
+            if C1.Group is None or C2.Group is None: # Removed by a wires merge
+                continue
+            G1, G2 = Find(C1.Group), Find(C2.Group)
+            if not G1 is G2:
+                Parents[G2] = G1
+        Sets = {}
+        for Group in list(Parents):
+            Sets.setdefault(Find(Group), [Find(Group)]).append(Group)
+        for Groups in Sets.values():
+            Largest = max(Groups, key = lambda Group: len(Group.Components))
+            Largest.Absorb([Group for Group in Groups if not Group is Largest])
+
     def Remember(self, Component):
         for Child in Component.Children:
             self.Remember(Child)
@@ -157,22 +260,27 @@ class ComponentsHandlerC(StorageItem):
                 if ID:
                     self.Link(self.Components[ID], NewComponent)
             return
-        for x,y,_ in NewComponent.AdvertisedLocations:
-            ConnID = self.Map[x,y,-1]
-            if ConnID == NewComponent.ID: # Need to check for location forbidden connexions
+        Locations = NewComponent.AdvertisedLocations.copy()
+        Locations[:,2] = -1
+        ConnIDs = self.Map.Gather(Locations) # Connexions layer, read at once
+        Seen = {0, NewComponent.ID} # Need to check for location forbidden connexions
+        for nLocation in np.flatnonzero(ConnIDs).tolist():
+            ConnID = int(ConnIDs[nLocation])
+            if ConnID in Seen: # Pins locations hold each cell once per direction
                 continue
-            if ConnID:
-                Connexion = self.Components[ConnID]
-                Connexion.UpdateColumn(self.Map[x,y,:])
-                self.Link(NewComponent, Connexion)
-        for x,y in NewComponent.AdvertisedConnexions: # Add automatically created connexions, in particular to existing hidden connexions
-            ConnID = self.Map[x,y,-1]
+            Seen.add(ConnID)
+            x, y, _ = Locations[nLocation].tolist()
+            Connexion = self.Components[ConnID]
+            Connexion.UpdateColumn(self.Map.Column(x, y))
+            self.Link(NewComponent, Connexion)
+        for x,y in NewComponent.AdvertisedConnexions.tolist(): # Add automatically created connexions, in particular to existing hidden connexions
+            ConnID = self.Map.Get(x, y, -1)
             if ConnID == NewComponent.ID: # Need to check for location forbidden connexions
                 continue
             if ConnID:
                 Connexion = self.Components[ConnID]
                 if not Connexion.LinkedTo(NewComponent):# If NewConnexion should already be within NewLocations, hidden connexions are avoided in previous method
-                    Connexion.UpdateColumn(self.Map[x,y,:])
+                    Connexion.UpdateColumn(self.Map.Column(x, y))
                     self.Link(NewComponent, Connexion)
             else:
                 self.AddConnexion((x,y)) # If not, we create it
@@ -180,6 +288,8 @@ class ComponentsHandlerC(StorageItem):
     def AddBoardPin(self, Pin):
         Pin.Index = len(self.Pins)
         if Params.GUI.Behaviour.AutoSwitchBoardPins:
+            if not self.PendingMerges is None: # Pin type depends on the level of its whole group
+                self.ApplyMerges(Stop = False)
             if (Pin.Group.Level == Levels.Undef):
                 Pin.Type = PinDict.Input
             else:
@@ -187,7 +297,7 @@ class ComponentsHandlerC(StorageItem):
         if Pin.Type == PinDict.Input:
             Pin.Side = PinDict.W
             Pin.TypeIndex = len(self.InputPins)
-            Pin.BoardInputSetLevel(0, ['AddBoardPin']) # Possible issue here if board level was previously set for this input pin, somehow
+            Pin.BoardInputSetLevel(0) # Possible issue here if board level was previously set for this input pin, somehow
         else:
             Pin.TypeIndex = len(self.OutputPins)
             Pin.Side = PinDict.E
@@ -203,6 +313,7 @@ class ComponentsHandlerC(StorageItem):
     def SetPinIndex(self, Pin, NewIndex, Rule = 'roll'):
         if Pin.Index == NewIndex:
             return
+        self.Invalidate()
         PreviousIndex = Pin.Index
         if Rule == 'roll':
             self.Pins.remove(Pin)
@@ -223,9 +334,11 @@ class ComponentsHandlerC(StorageItem):
 
     def CheckWireMerges(self, W1):
         for x, y in W1.AdvertisedConnexions:
-            Connexion = self.Components[self.Map[x,y,-1]]
+            Connexion = self.Components[self.Map.Get(x, y, -1)]
             if Connexion.ShouldMergeWires:
                 W2 = Connexion.Links.difference({W1}).pop() # Makes merge symetric
+                if not self.PendingMerges is None: # Merged wires must share their group
+                    self.ApplyMerges(Stop = False)
                 if W1.Group != W2.Group:
                     raise Exception(f"Merging wires {W1} and {W2} from two different groups")
                 self.Unlink(W1, Connexion)
@@ -233,9 +346,9 @@ class ComponentsHandlerC(StorageItem):
                 for Comp in set(W2.Links):
                     self.Unlink(W2, Comp)
                     self.Link(W1, Comp)
-                for x, y, theta in W2.AdvertisedLocations:
-                    self.Map[x,y,theta] = W1.ID
-                self.Map[x,y,-1] = 0
+                self.Map.Scatter(W2.AdvertisedLocations, W1.ID)
+                x, y, _ = W2.AdvertisedLocations[-1]
+                self.Map.Set(x, y, -1, 0)
                 W1.Extend(W2)
                 W2.destroy()
                 Connexion.destroy()
@@ -244,34 +357,59 @@ class ComponentsHandlerC(StorageItem):
                 W2.Group.RemoveComponent(W2)
                 Connexion.Group.RemoveComponent(Connexion)
 
-    @staticmethod
-    def Link(C1, C2):
+    def Link(self, C1, C2):
         C1.Links.add(C2)
         C2.Links.add(C1)
         if C1.Group != C2.Group:
-            C1.Group.Merge(C2.Group)
+            if self.PendingMerges is None:
+                C1.Group.Merge(C2.Group)
+            else:
+                self.PendingMerges.append((C1, C2))
     @staticmethod
     def Unlink(C1, C2):
         C1.Links.remove(C2)
         C2.Links.remove(C1)
 
+    def ComponentsInWindow(self, LowerLeft, UpperRight, MinID = None): # Components with a location within the window. Casings, that have no location of their own, are found through their pins
+        # With MinID, only the components registered from this ID on are considered, and are tested from their own locations rather than read from the map
+        if MinID is None:
+            IDs = self.Map.Window(int(LowerLeft[0]), int(LowerLeft[1]), int(UpperRight[0]), int(UpperRight[1])).tolist()
+        else:
+            IDs = []
+            for ID in range(MinID, self.MaxID+1):
+                Component = self.Components.get(ID)
+                if Component is None:
+                    continue
+                Locations = Component.AdvertisedLocations[:,:2]
+                if ((Locations >= LowerLeft) & (Locations <= UpperRight)).all(axis = 1).any():
+                    IDs.append(ID)
+        Components = set()
+        for ID in IDs:
+            Component = self.Components.get(ID)
+            if Component is None:
+                continue
+            Components.add(Component)
+            if isinstance(Component, ComponentsModule.CasingPinC):
+                Components.add(Component.Parent)
+                Components.update(Component.Parent.Children)
+        return Components
+
     def RegisterMap(self, Component):
-        for x, y, theta in Component.AdvertisedLocations:
-            self.Map[x,y,theta] = Component.ID
+        self.Map.Scatter(Component.AdvertisedLocations, Component.ID)
     def UnregisterMap(self, Component):
-        for x, y, theta in Component.AdvertisedLocations:
-            self.Map[x,y,theta] = 0
+        self.Map.Scatter(Component.AdvertisedLocations, 0)
 
     def ToggleConnexion(self, Location):
-        if self.Map[Location[0], Location[1],-1]:
-            Connexion = self.Components[self.Map[Location[0], Location[1],-1]]
+        self.Invalidate()
+        if self.Map.Get(Location[0], Location[1], -1):
+            Connexion = self.Components[self.Map.Get(Location[0], Location[1], -1)]
             if isinstance(Connexion, ComponentsModule.ConnexionC): # Second check for pin bases
                 self.RemoveConnexion(Connexion)
         else:
             self.AddConnexion(Location)
 
     def AddConnexion(self, Location):
-        NewConnexion = ComponentsModule.ConnexionC(Location, self.Map[Location[0], Location[1],:])
+        NewConnexion = ComponentsModule.ConnexionC(Location, self.Map.Column(Location[0], Location[1]))
         self.Remember(NewConnexion)
         self.SetComponent(NewConnexion)
     def RemoveConnexion(self, Connexion):
@@ -293,19 +431,19 @@ class ComponentsHandlerC(StorageItem):
         return Connexions
 
     def CursorGroups(self, Location):
-        return list({self.Components[ID].Group for ID in self.Map[Location[0], Location[1],:-1] if ID})
+        return list({self.Components[ID].Group for ID in self.Map.Column(Location[0], Location[1])[:-1] if ID})
     def CursorComponents(self, Location):  # We remove ComponentPin from single component highlight as nothing can be done with them alone
-        return list({self.Components[ID] for ID in self.Map[Location[0], Location[1],:-1] if (ID and not isinstance(self.Components[ID], ComponentsModule.CasingPinC))})
+        return list({self.Components[ID] for ID in self.Map.Column(Location[0], Location[1])[:-1] if (ID and not isinstance(self.Components[ID], ComponentsModule.CasingPinC))})
     def CursorCasings(self, Location):
         return list({Component for Component in self.Casings if Location in Component}) + list({Component for Component in self.Pins if Location in Component})
     def CursorConnected(self, Location):
-        return bool(self.Map[Location[0], Location[1],-1])
+        return bool(self.Map.Get(Location[0], Location[1], -1))
     def CanToggleConnexion(self, Location):
         if not self.CursorConnected(Location):
-            return (self.Map[Location[0], Location[1],:-1] != 0).sum() > 3 
+            return (self.Map.Column(Location[0], Location[1])[:-1] != 0).sum() > 3 
         else:
-            ID = self.Map[Location[0], Location[1], -1]
-            C = self.Components[self.Map[Location[0], Location[1], -1]]
+            ID = self.Map.Get(Location[0], Location[1], -1)
+            C = self.Components[ID]
             if not isinstance(C, ComponentsModule.ConnexionC):
                 return False
             return C.CanBeRemoved
@@ -314,7 +452,7 @@ class ComponentsHandlerC(StorageItem):
         NWires = 0
         Data = []
         Keypoint = False
-        Column = self.Map[Location[0], Location[1],:]
+        Column = self.Map.Column(Location[0], Location[1])
 
         Groups = {}
         for ID in Column[:-1]:
@@ -335,28 +473,22 @@ class ComponentsHandlerC(StorageItem):
         return ', '.join([str(Casing) for Casing in self.CursorCasings(Location)])
 
     def FreeSlot(self, Location):
-        return (self.Map[Location[0], Location[1], :8] == 0).any()
+        return (self.Map.Column(Location[0], Location[1])[:8] == 0).any()
     def Wired(self, Location):
-        for ID in self.Map[Location[0], Location[1], :8]:
+        for ID in self.Map.Column(Location[0], Location[1])[:8]:
             if ID and (isinstance(self.Components[ID], ComponentsModule.WireC) or isinstance(self.Components[ID], ComponentsModule.CasingPinC)):
                 return True
         return False
     def HasItem(self, Location):
-        return self.Map[Location[0], Location[1], :8].any()
+        return self.Map.Column(Location[0], Location[1])[:8].any()
 
     @property
     def ComponentsLimits(self):
-        PresenceMap = self.Map.any(axis = 2)
-        Limits = np.zeros((2,2), dtype = int)
-        xPresMap = PresenceMap.any(axis = 1)
-        Limits[0,:] = xPresMap.argmin(), xPresMap.argmax()
-        yPresMap = PresenceMap.any(axis = 0)
-        Limits[1,:] = yPresMap.argmin(), yPresMap.argmax()
-        Limits[np.where(Limits > Params.Board.Max)] -= Params.Board.Size
-        return Limits
+        return self.Map.Limits
 
 class GroupC(StorageItem):
     LibRef = "Group"
+    Absorber = None # Set once merged into another group. Union-find parent, see Root
     def __init__(self, Handler, Component):
         self.StoredAttribute('Handler', Handler)
         self.StoredAttribute('InitialComponent', Component)
@@ -372,9 +504,44 @@ class GroupC(StorageItem):
     def ID(self):
         return self.InitialComponent.ID
 
-    def Merge(self, Group): 
-        for Component in set(Group.Components):
-            self.AddComponent(Component)
+    def Root(self): # Group holding the components of this one, after merges. Absorbers links are compressed along the way
+        Root = self
+        while not Root.Absorber is None:
+            Root = Root.Absorber
+        Group = self
+        while not Group.Absorber is None and not Group.Absorber is Root:
+            Group.Absorber, Group = Root, Group.Absorber
+        return Root
+
+    def Merge(self, Group): # Union by size : the smaller group is absorbed into the larger one. Its components are not relabeled, see ComponentBase.Group
+        if len(Group.Components) > len(self.Components):
+            Group.Merge(self)
+            return
+        self.Absorb([Group])
+    def Absorb(self, Groups):
+        PreviousLevel = self.Level
+        Triggered = set() # Newly connected to this group, even if their level did not change
+        for Group in Groups:
+            Group.Absorber = self
+            self.Components.update(Group.Components)
+            self.Connexions.update(Group.Connexions)
+            self.Wires.update(Group.Wires)
+            self.SetBy.update(Group.SetBy)
+            del self.Handler.Groups[Group.ID]
+            Triggered.update(Group.Components)
+            Group.Components, Group.Connexions, Group.Wires, Group.SetBy = set(), set(), set(), {}
+
+        if len(self.SetBy) == 1:
+            self.Level = next(iter(self.SetBy.values()))
+        elif len(self.SetBy) == 0:
+            self.Level = Levels.Undef
+        else:
+            self.MultipleSetWarning()
+            self.Level = Levels.Multiple
+        if self.Level != PreviousLevel:
+            Triggered.update(self.Components)
+        for Component in Triggered:
+            self.TriggerComponentLevel(Component)
 
     def CreateGroupFrom(self, ComponentsSet):
         NewGroup = self.__class__(self.Handler, ComponentsSet.pop()) # We take any of the components of this new set as initial component
@@ -385,47 +552,74 @@ class GroupC(StorageItem):
                 Component.UpdateStyle()
         return NewGroup
 
-    def Split(self, RemovedComponents, Log = False, WarnEmptyGroup = False): 
-        if not Log:
-            def Log(txt):
-                pass
-        else:
-            def Log(txt):
-                print(txt)
+    def Split(self, RemovedComponents, Neighbours = None, WarnEmptyGroup = False):
+        # Neighbours are the remaining components that were linked to the removed ones. A search is started from each of them, and searches are run in turns.
+        # Searches that meet are merged, and a search that ends on its own has found a separated part. Work is thus bounded by the size of the separated parts rather than the whole group.
         self.Highlight(False)
         for Component in RemovedComponents:
             if Component.Group != self:
                 raise Exception("Attempting to remove several components from different group at once")
             self.RemoveComponent(Component)
-        RemainingComponents = set(self.Components)
-        while RemainingComponents:
-            ComponentsSet = set()
-            StartComponent = RemainingComponents.pop()
-            Log(f"Starting with {StartComponent}")
-            FoundComponents = {StartComponent}
-            while FoundComponents:
-                FoundComponent = FoundComponents.pop()
-                ComponentsSet.add(FoundComponent)
-                Log(f"  Studying {FoundComponent}")
-                for ConsideredComponent in FoundComponent.Links:
-                    Log(f"      Considering {ConsideredComponent}")
-                    if ConsideredComponent in RemainingComponents:
-                        FoundComponents.add(ConsideredComponent)
-                        RemainingComponents.remove(ConsideredComponent)
-                        Log("        Added")
-
-            FoundValidComponent = False
-            for Component in ComponentsSet: # We check that at least one component of this group is not a connexion. Groups should not be defined by connexions only
-                if not isinstance(Component, ComponentsModule.ConnexionC):
-                    FoundValidComponent = True
-                    break
-            if not self.InitialComponent in ComponentsSet:
-                Group = self.CreateGroupFrom(ComponentsSet)
-            else:
-                Group = self
-            Log(f"Final set for {Group}: {Group.Components}")
-            if not FoundValidComponent and WarnEmptyGroup:
-                LogWarning(f"{Group} contains only {len(Group.Connexions)} connexions")
+        if not self.Components:
+            return
+        if Neighbours is None or not self.InitialComponent in self.Components: # Group ID is lost, every part is moved to a new group
+            Neighbours = set(self.Components)
+
+        Owners = {} # Component -> search
+        Roots = [] # Union-find over searches
+        Found, Frontiers = [], []
+        def Find(nSearch):
+            while Roots[nSearch] != nSearch:
+                Roots[nSearch] = Roots[Roots[nSearch]]
+                nSearch = Roots[nSearch]
+            return nSearch
+        for Neighbour in Neighbours:
+            if Neighbour in Owners:
+                continue
+            Owners[Neighbour] = len(Roots)
+            Roots.append(len(Roots))
+            Found.append({Neighbour})
+            Frontiers.append(deque([Neighbour]))
+        Active = set(range(len(Roots)))
+        Parts = []
+        while len(Active) > 1:
+            for nSearch in list(Active):
+                if not nSearch in Active:
+                    continue
+                if not Frontiers[nSearch]:
+                    Active.remove(nSearch)
+                    Parts.append(Found[nSearch])
+                    continue
+                for Linked in Frontiers[nSearch].popleft().Links:
+                    if not Linked in Owners:
+                        Owners[Linked] = nSearch
+                        Found[nSearch].add(Linked)
+                        Frontiers[nSearch].append(Linked)
+                        continue
+                    nOther = Find(Owners[Linked])
+                    if nOther == nSearch:
+                        continue
+                    if len(Found[nOther]) > len(Found[nSearch]): # Union by size
+                        nSearch, nOther = nOther, nSearch
+                    Roots[nOther] = nSearch
+                    Found[nSearch].update(Found[nOther])
+                    Frontiers[nSearch].extend(Frontiers[nOther])
+                    Found[nOther], Frontiers[nOther] = None, None
+                    Active.discard(nOther)
+                    Active.add(nSearch)
+        Kept = None # Part keeping this group, as it holds the initial component. None for the unexplored part
+        for Part in Parts:
+            if self.InitialComponent in Part:
+                Kept = Part
+        for Part in Parts:
+            if not Part is Kept:
+                self.NewSplitGroup(Part, WarnEmptyGroup)
+        if Active and (not Kept is None or not self.InitialComponent in self.Components): # The unexplored part, left to the last search, must leave this group
+            self.NewSplitGroup(set(self.Components).difference(Kept or ()), WarnEmptyGroup)
+    def NewSplitGroup(self, Part, WarnEmptyGroup):
+        Group = self.CreateGroupFrom(Part)
+        if WarnEmptyGroup and not Group.Wires and Group.Components == Group.Connexions: # Groups should not be defined by connexions only
+            LogWarning(f"{Group} contains only {len(Group.Connexions)} connexions")
 
     def AddComponent(self, NewComponent, AutoSet = True):
         Level = None
@@ -443,9 +637,9 @@ class GroupC(StorageItem):
         if isinstance(NewComponent, ComponentsModule.WireC):
             self.Wires.add(NewComponent)
         if not Level is None:
-            self.SetLevel(Level, NewComponent, ['AddGroupComponent'])
+            self.SetLevel(Level, NewComponent)
         else:
-            self.TriggerComponentLevel(NewComponent, ['AddGroupComponent'])
+            self.TriggerComponentLevel(NewComponent)
 
     def RemoveComponent(self, Component, AutoSet = True, AutoRemove = True):
         Component.Group = None
@@ -457,7 +651,7 @@ class GroupC(StorageItem):
         if not self.Components and AutoRemove:
             del self.Handler.Groups[self.ID]
 
-    def SetLevel(self, Level, Component, Backtrace, Log = False, Warn = True):
+    def SetLevel(self, Level, Component, Log = False, Warn = True):
         if Log:
             if not Level is None:
                 print(self, self.Level, 'set to', Levels.Names[Level], 'by', Component)
@@ -478,24 +672,24 @@ class GroupC(StorageItem):
             self.Level = Levels.Multiple
         if PrevLevel != self.Level:
             for Component in self.Components:
-                self.TriggerComponentLevel(Component, Backtrace)
+                self.TriggerComponentLevel(Component)
         else:
             if not Component is None:
-                self.TriggerComponentLevel(Component, Backtrace)
+                self.TriggerComponentLevel(Component)
     def RemoveLevelSet(self, Component):
         if not Component in self.SetBy:
             raise Exception("{Component} was not level setter for {self}")
         del self.SetBy[Component]
         if not self.SetBy:
-            self.SetLevel(None, None, [f'RemoveGroupComponent(1) {self}'], Warn = False)
+            self.SetLevel(None, None, Warn = False)
         else:
             PickedComponent = list(self.SetBy.keys())[0]
-            self.SetLevel(self.SetBy[PickedComponent], PickedComponent, [f'RemoveGroupComponent(2) {self}'], Warn = False)
+            self.SetLevel(self.SetBy[PickedComponent], PickedComponent, Warn = False)
 
-    def TriggerComponentLevel(self, Component, Backtrace):
+    def TriggerComponentLevel(self, Component):
         Component.UpdateStyle()
         if Component.TriggersParent:
-            self.Handler.CallRequest(Component.Parent, Backtrace)
+            self.Handler.CallRequest(Component.Parent)
     def UnsetWarning(self):
         LogWarning(f"Group {self.ID} not set anymore")
     def MultipleSetWarning(self):
@@ -555,6 +749,7 @@ class CasingGroupC(StorageItem):
     Level = Levels.Undef
     Color = Colors.Component.Levels[Level]
     LibRef = "CGC"
+    Absorber = None
     def __init__(self, Handler):
         self.StoredAttribute("Handler", Handler)
         self.StoredAttribute("Components", set())
@@ -565,6 +760,65 @@ class CasingGroupC(StorageItem):
         self.Components.add(Component)
     def RemoveComponent(self, Component):
         self.Components.remove(Component)
-    def Split(self, Components):
+    def Split(self, Components, Neighbours = None):
         for Component in Components:
             self.RemoveComponent(Component)
+
+class UpdatesQueueC: # Casings awaiting evaluation. A casing is queued at most once until evaluated, so that duplicate requests coalesce
+    def __init__(self):
+        self.Ranks = None
+        self.Heap = [] # (Rank, ID, Casing), used when the board is acyclic
+        self.FIFO = deque() # Used otherwise, or while the board is being built
+        self.Depths = {} # Dirty casings, with the length of the chain of evaluations that requested them
+        self.Depth = 0
+        self.Stats = SettleStatsC()
+
+    def __len__(self):
+        return len(self.Depths)
+
+    def Push(self, Casing):
+        self.Stats.Events += 1
+        if Casing in self.Depths:
+            self.Depths[Casing] = max(self.Depths[Casing], self.Depth+1)
+            return
+        self.Depths[Casing] = self.Depth+1
+        if self.Ranks is None or not Casing in self.Ranks:
+            self.FIFO.append(Casing)
+        else:
+            heapq.heappush(self.Heap, (self.Ranks[Casing], Casing.ID, Casing))
+
+    def Pop(self):
+        if self.Heap:
+            _, _, Casing = heapq.heappop(self.Heap)
+        else:
+            Casing = self.FIFO.popleft()
+        self.Depth = self.Depths.pop(Casing)
+        self.Stats.Evaluations += 1
+        self.Stats.Depth = max(self.Stats.Depth, self.Depth)
+        return Casing
+
+    def SetRanks(self, Ranks): # Pending casings are reordered, and dropped if they are not part of the board anymore
+        if Ranks is None and self.Ranks is None:
+            return
+        Pending = list(self.FIFO) + [Casing for _, _, Casing in sorted(self.Heap)]
+        Depths = self.Depths
+        self.Ranks = Ranks
+        self.Heap, self.FIFO, self.Depths = [], deque(), {}
+        for Casing in Pending:
+            if not Ranks is None and not Casing in Ranks:
+                continue
+            self.Depths[Casing] = Depths[Casing]
+            if Ranks is None:
+                self.FIFO.append(Casing)
+            else:
+                self.Heap.append((Ranks[Casing], Casing.ID, Casing))
+        heapq.heapify(self.Heap)
+
+    def Clear(self):
+        self.Heap, self.FIFO, self.Depths = [], deque(), {}
+
+    def EndSettle(self): # Returns the statistics accumulated since the previous settle
+        Stats = self.Stats
+        self.Stats = SettleStatsC()
+        self.Depth = 0
+        return Stats
@@ -1,5 +1,4 @@
 import numpy as np
-import matplotlib.pyplot as plt
 
 from functools import cached_property
 
@@ -60,12 +59,15 @@ def Parenting(func):
 
 class ComponentBase(StorageItem):
     Display = None
+    Segment = None # Lines class of the display, set along with it as it needs matplotlib
     DefaultLinewidth = 0
     DefaultMarkersize = 0
     RotationAllowed = True
     CName = None
     Book = None
     DefaultSymmetric = False
+    CoarsePlot = None # How displays draw the component at wide zooms, when its detail plots are hidden
+    _Group = None
     def __init__(self, Location=None, Rotation=None, Symmetric=None): # As base for components, only one we cannot remove default arguments
         self.StoredAttribute('Location', Location)
         self.StoredAttribute('Rotation', Rotation)
@@ -85,18 +87,31 @@ class ComponentBase(StorageItem):
 
     def Start(self):
         self.Highlighted = False
+        if not self.Plotted: # Headless components, built or loaded without display, hold no plotting objects and their styles are never updated
+            self.Plots = self.HighlightPlots = self.LevelsPlots = self.NeutralPlots = ()
+            return
         self.Plots = []
         self.HighlightPlots = []
         self.LevelsPlots = []
         self.NeutralPlots = []
-
-        self.PlotInit()
+        self.DetailPlots = set() # Plots hidden at wide zooms, where displays draw a coarse version of the component
+        self.Coarse = False
+        self.StylePending = False
+        self.PlotPending = self.State.Fixed # Components loaded fixed are only plotted once a display culling shows them, see SetVisible
+        self.Shown = not self.PlotPending
+        if not self.PlotPending:
+            self.PlotInit()
+            self.UpdateAnimated()
 
     @Parenting
     def Highlight(self, var):
-        if var == self.Highlighted:
+        if var == self.Highlighted or not self.Plotted:
             return
         self.Highlighted = var
+        self.UpdateHighlight()
+        self.UpdateAnimated()
+        return
+    def UpdateHighlight(self):
         if self.Highlighted:
             Factor = Params.GUI.PlotsWidths.HighlightFactor
         else:
@@ -106,7 +121,6 @@ class ComponentBase(StorageItem):
                 Plot.set_linewidth(InitialLinewidth*Factor)
             if InitialMarkersize:
                 Plot.set_markersize(InitialMarkersize*Factor)
-        return
     @Parenting
     def Fix(self):
         if self.State.Fixed:
@@ -148,6 +162,9 @@ class ComponentBase(StorageItem):
         self.UpdateLocation()
     def Drag(self, Cursor):
         pass
+    @property
+    def Plotted(self):
+        return not self.Display is None
     def PlotInit(self):
         pass
 
@@ -165,16 +182,48 @@ class ComponentBase(StorageItem):
         return self.State.Alpha
 
     def UpdateStyle(self):
+        if not self.Plotted:
+            return
+        if not self.Shown: # Applied once back in view
+            self.StylePending = True
+            return
         Color, NeutralColor, Alpha = self.Color, self.NeutralColor, self.Alpha
-        for Plot in self.LevelsPlots:
-            Plot.set_color(Color)
-            Plot.set_alpha(Alpha)
-        for Plot in self.NeutralPlots:
-            Plot.set_color(NeutralColor)
-            Plot.set_alpha(Alpha)
-
-    def plot(self, *args, Highlight = True, LevelPlot = True, **kwargs):
-        Plot = self.Display.plot(*args, **kwargs)[0]
+        for Plots, PlotsColor in ((self.LevelsPlots, Color), (self.NeutralPlots, NeutralColor)):
+            for Plot in Plots:
+                if Alpha == 0 and Plot.get_alpha() == 0: # Invisible plots are left untouched, so that displays do not draw them again
+                    continue
+                Plot.set_color(PlotsColor)
+                Plot.set_alpha(Alpha)
+        self.UpdateAnimated()
+    def SetVisible(self, Visible, Coarse = False): # Used by displays to hide off-screen components, and details of components at wide zooms
+        if not self.Plotted or (Visible == self.Shown and Coarse == self.Coarse) or self.State.Removed:
+            return
+        if Visible and self.PlotPending: # First time in view. Plots are created with the current style
+            self.PlotPending = self.StylePending = False
+            self.PlotInit()
+            self.UpdateHighlight()
+            self.UpdateAnimated()
+        self.Shown, self.Coarse = Visible, Coarse
+        for Plot in self.Plots:
+            Plot.set_visible(Visible and not (Coarse and Plot in self.DetailPlots))
+        if Visible and self.StylePending:
+            self.StylePending = False
+            self.UpdateStyle()
+    @property
+    def Animated(self): # Plots of transient components (built, selected, removing or highlighted) are redrawn at each frame rather than cached by the display
+        return self.Highlighted or not self.State.Fixed
+    def UpdateAnimated(self):
+        Animated = self.Animated
+        for Plot in self.Plots:
+            if Plot.get_animated() != Animated:
+                Plot.set_animated(Animated)
+                Plot.stale = True # Plots leaving animation may be missing from the cached background
+
+    def plot(self, *args, Highlight = True, LevelPlot = True, Detail = False, **kwargs):
+        if 'marker' in kwargs:
+            Plot = self.Display.plot(*args, **kwargs)[0]
+        else: # Lines are batched into the segments layers of the display
+            Plot = self.Segment(self.Display, *args, Animated = self.Animated, **kwargs)
         self.Plots.append(Plot)
         if LevelPlot:
             self.LevelsPlots.append(Plot)
@@ -182,9 +231,13 @@ class ComponentBase(StorageItem):
             self.NeutralPlots.append(Plot)
         if Highlight:
             self.HighlightPlots.append((Plot, kwargs.get('linewidth', self.DefaultLinewidth), kwargs.get('markersize', self.DefaultMarkersize)))
-    def text(self, *args, LevelPlot = False, **kwargs): # Cannot highlight text, would get messy
+        if Detail:
+            self.DetailPlots.add(Plot)
+    def text(self, *args, LevelPlot = False, Detail = False, **kwargs): # Cannot highlight text, would get messy
         Text = self.Display.text(*args, **kwargs)
         self.Plots.append(Text)
+        if Detail:
+            self.DetailPlots.add(Text)
         if LevelPlot:
             self.LevelsPlots.append(Text)
         else:
@@ -200,9 +253,19 @@ class ComponentBase(StorageItem):
     @property
     def InputReady(self): # Base components are not ready by default as they should not be updated (wires, connexions, ...)
         return False
-    def __call__(self, Backtrace):
+    def __call__(self):
         return 
     @property
+    def Group(self): # Groups absorbed by a merge keep a link to the absorbing group, their components are moved on first access
+        Group = self._Group
+        if not Group is None and not Group.Absorber is None:
+            Group = Group.Root()
+            self._Group = Group
+        return Group
+    @Group.setter
+    def Group(self, Group):
+        self._Group = Group
+    @property
     def Level(self):
         if self.Group is None:
             return Levels.Undef
@@ -275,12 +338,14 @@ class BoardPinC(ComponentBase):
     def PlotInit(self):
         Color, Alpha = self.Color, self.Alpha
         self.plot(*np.zeros((2,2), dtype = int), color = Color, linestyle = Params.GUI.PlotsStyles.BoardPin, linewidth = Params.GUI.PlotsWidths.BoardPin, alpha = Alpha)
-        self.text(*np.zeros(2, dtype = int), s=self.Label, LevelPlot = Params.GUI.PlotsStyles.PinNameLevelColored, color = Color, alpha = Alpha, **PinNameDict(self.UsedRotation+2))
+        self.text(*np.zeros(2, dtype = int), s=self.Label, LevelPlot = Params.GUI.PlotsStyles.PinNameLevelColored, color = Color, alpha = Alpha, Detail = True, **PinNameDict(self.UsedRotation+2))
 
         for BoxSide in range(5):
-            self.plot(*np.zeros((2,2), dtype = int), color = Color, linestyle = Params.GUI.PlotsStyles.BoardPin, linewidth = Params.GUI.PlotsWidths.BoardPin, alpha = Alpha)
+            self.plot(*np.zeros((2,2), dtype = int), color = Color, linestyle = Params.GUI.PlotsStyles.BoardPin, linewidth = Params.GUI.PlotsWidths.BoardPin, alpha = Alpha, Detail = True)
         self.UpdateLocation()
     def UpdateLocation(self):
+        if not self.Plots: # Headless, or not plotted yet
+            return
         Loc = self.Location
         BLoc = self.PinBaseLocation
         self.Plots[0].set_data([Loc[0], BLoc[0]], [Loc[1], BLoc[1]])
@@ -302,8 +367,8 @@ class BoardPinC(ComponentBase):
         self.Location = np.array(Cursor)
         self.UpdateLocation()
 
-    def BoardInputSetLevel(self, Level, Backtrace):
-        self.Group.SetLevel(Level, self, Backtrace)
+    def BoardInputSetLevel(self, Level):
+        self.Group.SetLevel(Level, self)
     @property
     def Valid(self):
         return not (self.Level >> 1)
@@ -313,21 +378,25 @@ class BoardPinC(ComponentBase):
     @PinLabelRule.setter
     def PinLabelRule(self, value):
         self._PinLabelRule = value
-        self.Plots[1].set_text(self.Label)
+        self.UpdateLabel()
     @property
     def Index(self):
         return self._Index
     @Index.setter
     def Index(self, Index):
         self._Index = Index
-        self.Plots[1].set_text(self.Label)
+        self.UpdateLabel()
     @property
     def Name(self):
         return self._Name
     @Name.setter
     def Name(self, Name):
         self._Name = Name
-        self.Plots[1].set_text(self.Label)
+        self.UpdateLabel()
+
+    def UpdateLabel(self):
+        if self.Plots:
+            self.Plots[1].set_text(self.Label)
 
     @property
     def Type(self):
@@ -371,6 +440,8 @@ class CasedComponentC(ComponentBase): # Template to create any type of component
     ForceHeight = None
     PinLabelRule = None
     Symbol = ''
+    GateCode = None # Set for library gates that compiled netlists can evaluate natively
+    CoarsePlot = 'Rectangle'
 
     @staticmethod
     def DefinitionDict():
@@ -386,6 +457,7 @@ class CasedComponentC(ComponentBase): # Template to create any type of component
             'ForceHeight'   : None,
             'ForceWidth'    : None,
             'Symbol'        : '',
+            'GateCode'      : None,
         }
     def __init__(self, Location, Rotation, Symmetric):
         super().__init__(Location, Rotation, Symmetric)
@@ -459,17 +531,21 @@ class CasedComponentC(ComponentBase): # Template to create any type of component
     def LocToSWOffset(self):
         return self.LocToVirtualSWOffset - Params.GUI.Dimensions.CasingCornerOffset
 
-    def __call__(self, Backtrace):
+    def __call__(self):
         if not self.State.Fixed:
-##            Log(f"{self} ({self.State}) stopping request propagation {Backtrace}")
+##            Log(f"{self} ({self.State}) stopping request propagation")
             return
         if not self.InputReady:
             for Pin in self.OutputPins:
-                Pin.CasingOutputSetLevel(Levels.Undef, Backtrace + [self])
+                Pin.CasingOutputSetLevel(Levels.Undef)
             return 
+        if not self.Board is None: # Inner boards give the full levels of their outputs, so that undefined levels propagate
+            for Pin, Level in zip(self.OutputPins, self.Board.EvaluateLevels(self.InputLevel)):
+                Pin.CasingOutputSetLevel(Level)
+            return
         OutputLevel = self.Run(self.InputLevel)
         for Pin in self.OutputPins:
-            Pin.CasingOutputSetLevel((OutputLevel & 0b1), Backtrace + [self])
+            Pin.CasingOutputSetLevel((OutputLevel & 0b1))
             OutputLevel >>= 1
         return 
     @property
@@ -517,6 +593,8 @@ class CasedComponentC(ComponentBase): # Template to create any type of component
 
     @Parenting
     def UpdateLocation(self):
+        if not self.Plots: # Headless, or not plotted yet
+            return
         for Plot, (Xs, Ys) in zip(self.Plots[:4], self.CasingSides):
             Plot.set_data(Xs, Ys)
         TLoc = self.TextLocation
@@ -527,8 +605,8 @@ class CasedComponentC(ComponentBase): # Template to create any type of component
     def PlotInit(self):
         Color, Alpha = self.Color, self.Alpha
         for Xs, Ys in self.CasingSides:
-            self.plot(Xs, Ys, color = Color, linestyle = Params.GUI.PlotsStyles.Casing, linewidth = Params.GUI.PlotsWidths.Casing, alpha = Alpha, LevelPlot = False)
-        self.text(*self.TextLocation, s = (self.CName, self.Symbol)[bool(self.Symbol)], color = Color, va = 'center', ha = 'center', rotation = self.TextRotation, alpha = Alpha)
+            self.plot(Xs, Ys, color = Color, linestyle = Params.GUI.PlotsStyles.Casing, linewidth = Params.GUI.PlotsWidths.Casing, alpha = Alpha, LevelPlot = False, Detail = True)
+        self.text(*self.TextLocation, s = (self.CName, self.Symbol)[bool(self.Symbol)], color = Color, va = 'center', ha = 'center', rotation = self.TextRotation, alpha = Alpha, Detail = True)
 
     @property
     def TextLocation(self):
@@ -601,12 +679,14 @@ class CasingPinC(ComponentBase):
         BLoc = self.PinBaseLocation
         Color, Alpha = self.Color, self.Alpha
         self.plot([Loc[0], BLoc[0]], [Loc[1], BLoc[1]], color = Color, linestyle = Params.GUI.PlotsStyles.CasingPin, linewidth = Params.GUI.PlotsWidths.CasingPin, alpha = Alpha)
-        self.text(*self.TextLocation, s=self.Label, LevelPlot = Params.GUI.PlotsStyles.PinNameLevelColored, color = Color, alpha = Alpha, **PinNameDict(self.Rotation + self.BaseRotation))
+        self.text(*self.TextLocation, s=self.Label, LevelPlot = Params.GUI.PlotsStyles.PinNameLevelColored, color = Color, alpha = Alpha, Detail = True, **PinNameDict(self.Rotation + self.BaseRotation))
 
         for BoxSide in range(self.ArrowCorners.shape[0]):
-            self.plot(*np.zeros((2,2), dtype = int), color = Color, linestyle = Params.GUI.PlotsStyles.CasingPin, linewidth = Params.GUI.PlotsWidths.CasingPin, alpha = Alpha)
+            self.plot(*np.zeros((2,2), dtype = int), color = Color, linestyle = Params.GUI.PlotsStyles.CasingPin, linewidth = Params.GUI.PlotsWidths.CasingPin, alpha = Alpha, Detail = True)
         self.UpdateLocation()
     def UpdateLocation(self):
+        if not self.Plots: # Headless, or not plotted yet
+            return
         Loc = self.Location
         BLoc = self.PinBaseLocation
         self.Plots[0].set_data([Loc[0], BLoc[0]], [Loc[1], BLoc[1]])
@@ -682,8 +762,8 @@ class OutputPinC(CasingPinC):
     CName = "Output Pin"
     LibRef = "OPin"
     Type = PinDict.Output
-    def CasingOutputSetLevel(self, Level, Backtrace):
-        self.Group.SetLevel(Level, self, Backtrace)
+    def CasingOutputSetLevel(self, Level):
+        self.Group.SetLevel(Level, self)
 
 def PinLabel(PinLabelRule, Index, Name):
     s = ""
@@ -715,6 +795,7 @@ def RotateOffset(Offset, Rotation): # Use LRU ?
 class WireC(ComponentBase):
     CName = "Wire"
     DefaultSymmetric = Params.GUI.Behaviour.DefaultWireSymmetric
+    CoarsePlot = 'Raster'
     def __init__(self, Location, Rotation, Symmetric, WireParent=None):
         super().__init__(Location, Rotation, Symmetric)
 
@@ -728,7 +809,7 @@ class WireC(ComponentBase):
 
     def PlotInit(self):
         Color, Alpha = self.Color, self.Alpha
-        self.plot(self.Location[:,0], self.Location[:,1], color = Color, linestyle = Params.GUI.PlotsStyles.Wire, linewidth = Params.GUI.PlotsWidths.Wire, alpha = Alpha)
+        self.plot(self.Location[:,0], self.Location[:,1], color = Color, linestyle = Params.GUI.PlotsStyles.Wire, linewidth = Params.GUI.PlotsWidths.Wire, alpha = Alpha, Detail = True)
 
     @property
     def Location(self):
@@ -760,15 +841,18 @@ class WireC(ComponentBase):
     def AdvertisedLocations(self):
         if not self.CanFix:
             raise Exception("Asking AdvertisedLocations of a non buildable wire")
-        AdvertisedLocations = []
         P1, P2 = self.Location
         A = self.StartAngle
-        AdvertisedLocations.append((P1[0], P1[1], A))
-        for x, y in np.linspace(P1, P2, abs(P2-P1).max()+1, dtype = int)[1:-1]:
-            AdvertisedLocations.append((x,y,A))
-            AdvertisedLocations.append((x,y,(A+4)%8))
-        AdvertisedLocations.append((P2[0], P2[1], (A+4)%8))
-        return np.array(AdvertisedLocations)
+        N = abs(P2-P1).max()
+        AdvertisedLocations = np.empty((2*N, 3), dtype = int) # Start, then each inner point in both directions, then end
+        Points = P1 + np.arange(N+1).reshape(-1, 1) * np.sign(P2-P1) # Wires are straight or diagonal
+        AdvertisedLocations[0::2,:2] = Points[:-1]
+        AdvertisedLocations[1::2,:2] = Points[1:]
+        AdvertisedLocations[0::2,2] = (A+4)%8
+        AdvertisedLocations[1::2,2] = A
+        AdvertisedLocations[0,2] = A
+        AdvertisedLocations[-1,2] = (A+4)%8
+        return AdvertisedLocations
     @property
     def AdvertisedConnexions(self):
         return self.Location
@@ -818,6 +902,8 @@ class WireC(ComponentBase):
         self.UpdatePlot()
 
     def UpdatePlot(self):
+        if not self.Plots:
+            return
         self.Plots[0].set_data(self.Location[:,0], self.Location[:,1])
 
     @property
@@ -853,10 +939,11 @@ class ConnexionC(ComponentBase):
 
         self.Start()
         self.State = States.Fixed
+        self.UpdateAnimated()
 
     def PlotInit(self):
         Color, Alpha = self.Color, self.Alpha
-        self.plot(self.Location[0], self.Location[1], Highlight = False, marker = Params.GUI.PlotsStyles.Connexion, markersize = Params.GUI.PlotsWidths.Connexion, color = Color, alpha = self.Alpha)
+        self.plot(self.Location[0], self.Location[1], Highlight = False, marker = Params.GUI.PlotsStyles.Connexion, markersize = Params.GUI.PlotsWidths.Connexion, color = Color, alpha = self.Alpha, Detail = True)
 
     def UpdateColumn(self, Column):
         if Column[-1] != self.ID:
@@ -1,5 +1,5 @@
 from Components import WireC, BoardPinC, PinDict
-from Values import Levels
+from Values import Levels, Gates
 
 def W(SideIndex, Name = ''):
     return ((PinDict.W, SideIndex), Name)
@@ -11,7 +11,7 @@ def S(SideIndex, Name = ''):
     return ((PinDict.S, SideIndex), Name)
 
 Name = 'Standard'
-_DefTuple = ('InputPinsDef', 'OutputPinsDef', 'Callback', 'UndefRun', 'Board', 'ForceWidth', 'ForceHeight', 'PinLabelRule', 'Symbol')
+_DefTuple = ('InputPinsDef', 'OutputPinsDef', 'Callback', 'UndefRun', 'Board', 'ForceWidth', 'ForceHeight', 'PinLabelRule', 'Symbol', 'GateCode')
 _Definitions = (
     ('Wire' ,WireC, 'w'),
     ('I/O'  ,BoardPinC, 'i'),
@@ -24,7 +24,8 @@ _Definitions = (
         None, 
         None, 
         0b00,
-        '&'), 'a'),
+        '&',
+        Gates.And), 'a'),
     ('Or' ,([W(0),
              W(1)],
             [E(0)],
@@ -34,7 +35,8 @@ _Definitions = (
         None, 
         None, 
         0b00,
-        '|'), 'o'),
+        '|',
+        Gates.Or), 'o'),
     ('XOr' ,([W(0),
              W(1)],
             [E(0)],
@@ -44,7 +46,8 @@ _Definitions = (
         None, 
         None, 
         0b00,
-        '^'), 'x'),
+        '^',
+        Gates.XOr), 'x'),
     ('Not',([W(0, 'in')],
             [E(0, 'out')],
         lambda a   : not a  , 
@@ -53,7 +56,8 @@ _Definitions = (
         None, 
         None, 
         0b00,
-        '~'), 'n'),
+        '~',
+        Gates.Not), 'n'),
     ('High' ,([],
         [E(0)],
         lambda a   : True   , 
@@ -62,7 +66,8 @@ _Definitions = (
         None, 
         None,
         0b00,
-        '+'), 'h'),
+        '+',
+        Gates.High), 'h'),
     ('Low',([],
         [E(0)],
         lambda a    : False  , 
@@ -71,7 +76,8 @@ _Definitions = (
         None, 
         None,
         0b00,
-        '-'), 'l'),
+        '-',
+        Gates.Low), 'l'),
     ('Pull-down',([W(0, 'in')],
         [E(0, 'out')],
         lambda a    : (Levels.High if a == Levels.High else Levels.Low)  , 
@@ -80,7 +86,8 @@ _Definitions = (
         None, 
         None,
         0b00,
-        '='), 'q'),
+        '=',
+        Gates.PullDown), 'q'),
 )
 
 def UnpackDef(CDef):
@@ -84,6 +84,9 @@ class ExportGUI:
         TruthTableFrame = self.MainFrame.TopPanel.AddFrame("TruthTable")
         TruthTableFrame.AddWidget(Tk.Label, row = 0, column = 0, text = "Truth table:")
         self.TTButton = TruthTableFrame.AddWidget(Tk.Button, row = 0, column = 1, text = "", width = 20, command = self.ComputeTruthTable)
+        self.TTProgress = TruthTableFrame.AddWidget(ttk.Progressbar, row = 0, column = 2, orient = 'horizontal', length = 150, mode = 'determinate', maximum = 1.)
+        self.TTCancelButton = TruthTableFrame.AddWidget(Tk.Button, row = 0, column = 3, text = "Cancel", command = self.CancelTruthTable, state = Tk.DISABLED)
+        self.TTCancelled = False
 
         self.Display = ComponentDisplayC(self.MainFrame.View.frame)
         self.Display.Widget.grid(row = 0, column = 0)
@@ -214,7 +217,18 @@ class ExportGUI:
         if NBits > Params.GUI.TruthTable.WarningLimitNBits:
             if not messagebox.askokcancel("Large input", f"Computing truth table for {NBits} bits ({2**NBits} possibilities) ?"):
                 return
-        self.Board.ComputeTruthTable()
+        self.TTCancelled = False
+        self.TTButton.configure(text='Computing', state = Tk.DISABLED)
+        self.TTCancelButton.configure(state = Tk.NORMAL)
+        Computed = self.Board.ComputeTruthTable(Progress = self.TruthTableProgress)
+        if not self.ExportWindow.winfo_exists(): # Window closed during the computation, that was then cancelled
+            return
+        self.TTButton.configure(state = Tk.NORMAL)
+        self.TTCancelButton.configure(state = Tk.DISABLED)
+        if not Computed:
+            self.TTButton.configure(text='Compute')
+            self.TTProgress.configure(value = 0.)
+            return
         self.TTButton.configure(text='Up to date')
         self.TTButton.configure(bg=Colors.GUI.Widget.validButton)
         self.TTButton.configure(activebackground=Colors.GUI.Widget.validButton)
@@ -245,7 +259,17 @@ class ExportGUI:
         self.Success = True
         self.OnClose()
 
+    def TruthTableProgress(self, Done, Total): # Called by the board after each chunk of inputs. Events are processed here so that the cancel button stays usable
+        if self.TTCancelled:
+            return True
+        self.TTProgress.configure(value = Done / Total)
+        self.ExportWindow.update()
+        return self.TTCancelled
+    def CancelTruthTable(self):
+        self.TTCancelled = True
+
     def OnClose(self, *args, **kwargs):
+        self.TTCancelled = True
         self.ExportWindow.destroy()
 
 class ComponentDisplayC:
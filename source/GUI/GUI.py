@@ -2,8 +2,7 @@ import tkinter as Tk
 from tkinter import ttk
 from tkinter import messagebox
 from PIL import Image
-import os, sys
-import sys
+import os, sys, time
 import numpy as np
 import json
 
@@ -11,9 +10,10 @@ import matplotlib
 from matplotlib.backends.backend_tkagg import NavigationToolbar2Tk
 
 from utils import Void
-from Console import ConsoleWidget, ConsoleText, Log, LogSuccess, LogWarning, LogError
+from Console import Log, LogSuccess, LogWarning, LogError
+from ConsoleGUI import ConsoleWidget, ConsoleText
 from Values import Colors, Params, PinDict
-from GUITools import ModesDict, ModeC, SFrame, SEntry, SLabel, SPinEntry, BoardIOWidgetBase, BoardDisplayC
+from GUITools import ModesDict, ModeC, SFrame, SEntry, SLabel, SPinEntry, BoardIOWidgetBase, BoardDisplayC, SegmentC
 from Library import LibraryHandlerC
 import DefaultLibrary
 from Board import BoardC
@@ -32,7 +32,8 @@ class GUI:
                 UpdateWhenFinished = True
             res = func(self, *args, **kwargs)
             if UpdateWhenFinished:
-                self.SolveUpdateRequests(func)
+                self.UpdateLocked = False
+                self.ScheduleUpdateRequests(func)
             return res
         return WrapTrigger
     def Update(*UpdateFunctions):
@@ -45,14 +46,14 @@ class GUI:
         return Wrapper
 
     def LocalView(self):
-        self.CurrentDisplay.Canvas.draw()
+        self.CurrentDisplay.Draw()
     def BoardState(self):
         for BoardInputWidget in self.BoardInputWidgets:
             BoardInputWidget.Pull(self.CurrentBoard.Input, self.CurrentBoard.InputValid)
         if self.CurrentBoard.LiveUpdate:
             for BoardOutputWidget in self.BoardOutputWidgets:
                 BoardOutputWidget.Pull(self.CurrentBoard.Output, self.CurrentBoard.OutputValid)
-        self.CurrentDisplay.Canvas.draw()
+        self.LocalView.Callers.add('BoardState') # Levels changes are drawn with the rest of the view, once per update
     def CursorInfo(self):
         GroupsInfo = self.CurrentBoard.GroupsInfo(self.Cursor)
         self.MainFrame.Board.DisplayToolbar.Labels.CursorLabel['text'] = f"{self.Cursor.tolist()}" + bool(GroupsInfo)*": " + self.CurrentBoard.GroupsInfo(self.Cursor)
@@ -153,6 +154,26 @@ class GUI:
             if Board == self.CurrentBoard:
                 self.BoardVar.set(BoardName)
 
+    def ScheduleUpdateRequests(self, func): # Update requests are solved when Tk gets idle, at most once per frame. Requests made in the meantime are merged
+        if not self.UpdateScheduled is None:
+            return
+        self.UpdateTrigger = func
+        Delay = int(1000 * (self.LastUpdate + 1 / Params.GUI.View.MaxFPS - time.perf_counter()))
+        if Delay > 0:
+            self.UpdateScheduled = self.MainWindow.after(Delay, self.FlushUpdateRequests)
+        else:
+            self.UpdateScheduled = self.MainWindow.after_idle(self.FlushUpdateRequests)
+    def FlushUpdateRequests(self):
+        self.UpdateScheduled = None
+        self.LastUpdate = time.perf_counter()
+        self.UpdateLocked = True # Triggers fired by update functions are solved at next frame
+        try:
+            self.SolveUpdateRequests(self.UpdateTrigger)
+        finally: # A failing update function must not block later updates
+            self.UpdateLocked = False
+        if any(UpdateFunction.Callers for UpdateFunction in self.UpdateFunctions):
+            self.ScheduleUpdateRequests(self.UpdateTrigger)
+
     def SolveUpdateRequests(self, func, Log = False):
         if Log:
             print(f"Triggered by {func.__name__}")
@@ -168,6 +189,9 @@ class GUI:
     for UpdateFunction in UpdateFunctions:
         UpdateFunction.Callers = set()
     UpdateLocked = False
+    UpdateScheduled = None
+    UpdateTrigger = None
+    LastUpdate = 0.
 
     def __init__(self, Args):
         if not os.path.exists(Params.GUI.DataAbsPath):
@@ -187,6 +211,7 @@ class GUI:
         BoardIOWidgetBase.GUI = self
         ModeC.GUI = self
         self.LibraryHandler = LibraryHandlerC()
+        self.LibraryHandler.ComponentBase.Segment = SegmentC
         self.LoadedBoards = []
         self.LoadedDisplays = []
         self.CurrentBoard = None
@@ -243,6 +268,10 @@ class GUI:
     def OnStaticGUIButton(self, Callback, *args, **kwargs):
         return Callback(*args, **kwargs)
 
+    @Trigger
+    def OnUpdateButton(self, UpdateFunction):
+        UpdateFunction.Callers.add('OnUpdateButton')
+
     @Trigger
     def OnKeyRegistration(self, Callback, Key, Mod):
         Callback(Key, Mod)
@@ -739,10 +768,10 @@ class GUI:
 
     def LoadUpdateFunctions(self):
         UpdateFrame = self.MainFrame.Top_Panel.AddFrame("UpdateFunctions", Side = Tk.TOP, NoName = True)
-        UpdateFrame.AddWidget(Tk.Button, "Pins_layout", text = "Pins layout", command = self.BoardPinsLayout, width = 20)
-        UpdateFrame.AddWidget(Tk.Button, "Cursor_info", text = "Cursor info", command = self.CursorInfo, width = 20)
-        UpdateFrame.AddWidget(Tk.Button, "Board_state", text = "Board state", command = self.BoardState, width = 20)
-        UpdateFrame.AddWidget(Tk.Button, "Local_view", text = "Local view", command = self.LocalView, width = 20)
+        UpdateFrame.AddWidget(Tk.Button, "Pins_layout", text = "Pins layout", command = lambda:self.OnUpdateButton(self.BoardPinsLayout), width = 20)
+        UpdateFrame.AddWidget(Tk.Button, "Cursor_info", text = "Cursor info", command = lambda:self.OnUpdateButton(self.CursorInfo), width = 20)
+        UpdateFrame.AddWidget(Tk.Button, "Board_state", text = "Board state", command = lambda:self.OnUpdateButton(self.BoardState), width = 20)
+        UpdateFrame.AddWidget(Tk.Button, "Local_view", text = "Local view", command = lambda:self.OnUpdateButton(self.LocalView), width = 20)
 
     def LoadTruthTableWidgets(self):
         TTFrame = self.MainFrame.Top_Panel.AddFrame("TruthTable", Side = Tk.TOP, NoName = True)
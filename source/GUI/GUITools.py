@@ -2,12 +2,33 @@ import tkinter as Tk
 import numpy as np
 
 import matplotlib
+import matplotlib.collections
+import matplotlib.image
+from matplotlib.colors import to_rgba
+from matplotlib.transforms import Bbox
+from Rendering import SegmentC
 from functools import cached_property
 from Console import Log
 from Values import Colors, Params, PinDict
 
 ForceReload = True
 
+class ClippedRendererC: # Renderer proxy clipping every drawing to a display box, so that a region of the figure can be drawn again from scratch
+    Outside = Bbox([[-2, -2], [-1, -1]]) # Agg reads an all zeros clip box as no clipping
+    def __init__(self, Renderer, Box):
+        self.Renderer = Renderer
+        self.Box = Box
+    def new_gc(self):
+        GC = self.Renderer.new_gc()
+        SetClipRectangle = GC.set_clip_rectangle
+        def ClipRectangle(Rectangle):
+            SetClipRectangle(self.Box if Rectangle is None else (Bbox.intersection(Rectangle, self.Box) or self.Outside))
+        ClipRectangle(None)
+        GC.set_clip_rectangle = ClipRectangle
+        return GC
+    def __getattr__(self, Name):
+        return getattr(self.Renderer, Name)
+
 class ModeC:
     GUI = None
     Current = None
@@ -471,10 +492,28 @@ class BoardDisplayC:
         RLE = Params.GUI.View.RefLineEvery
         if RLE:
             NLines = Params.Board.Size // RLE
-            self.Plots['HLines']=[self.Ax.plot([-Params.Board.Max, Params.Board.Max],
-                                 [nLine*RLE, nLine*RLE], color = Colors.GUI.default, alpha = 0.2)[0] for nLine in range(-NLines//2+1, NLines//2)]
-            self.Plots['VLines']=[self.Ax.plot([nLine*RLE, nLine*RLE],
-                                 [-Params.Board.Max, Params.Board.Max], color = Colors.GUI.default, alpha = 0.2)[0] for nLine in range(-NLines//2+1, NLines//2)]
+            Lines = [((-Params.Board.Max, nLine*RLE), (Params.Board.Max, nLine*RLE)) for nLine in range(-NLines//2+1, NLines//2)]
+            Lines += [((nLine*RLE, -Params.Board.Max), (nLine*RLE, Params.Board.Max)) for nLine in range(-NLines//2+1, NLines//2)]
+            self.Plots['Grid'] = self.Ax.add_collection(matplotlib.collections.LineCollection(Lines, colors = Colors.GUI.default, alpha = 0.2), autolim = False)
+
+        for Name in ('Cursor', 'HCursor', 'VCursor'):
+            if Name in self.Plots:
+                self.Plots[Name].set_animated(True)
+
+        # Level of detail. Views wider than Params.GUI.View.LODxSize hide the details of components, and draw casings as filled rectangles and wires as an image of the board map
+        self.Plots['Casings'] = self.Ax.add_collection(matplotlib.collections.PolyCollection([]), autolim = False)
+        self.Plots['Wires'] = matplotlib.image.AxesImage(self.Ax, origin = 'lower', interpolation = 'nearest')
+        self.Plots['Wires'].set_data(np.zeros((1,1,4)))
+        self.Ax.add_image(self.Plots['Wires'])
+        for Name in ('Casings', 'Wires'):
+            self.Plots[Name].set_visible(False)
+        self.Coarse = False
+        self.CoarseCasings = None
+        self.CasingsStyles = None # Colors and alphas of the casings rectangles
+        self.WiresIndices = None # Palette index of each cell of the wires image
+        self.WiresPalette = None
+        self.WiresGroups = None
+        self.WiresLevels = None
 
         self.Cursor = None
         self.xSize = None
@@ -482,6 +521,96 @@ class BoardDisplayC:
 
         self.Board = None
 
+        # Blitting. The figure is fully drawn only when artists are added, removed, shown or hidden, or when the view changes, and the result is cached as background.
+        # The region covered by the artists changed since is drawn again from scratch over it, and cached as well. Animated artists (cursor and transient components) are drawn over it at each frame.
+        self.Visible = None # Components within the view at last culling, None before the first one
+        self.CulledMaxID = 0
+        self.CulledState = None # Components registered at last culling. Any change triggers a new culling at next draw
+        self.CulledWindow = None # (xMin, yMin, xMax, yMax) cells range of the last culling
+
+        self.Background = None
+        self.BackgroundArtists = set() # Visible non animated artists of the cached background
+        self.BackgroundTexts = {}
+        self.Canvas.mpl_connect('draw_event', self.OnDraw)
+
+    def OnDraw(self, Event): # Any full draw, including the ones triggered by Tk, refreshes the background
+        Children = self.Ax.get_children()
+        self.Background = self.Canvas.copy_from_bbox(self.Figure.bbox)
+        self.BackgroundArtists = {Artist for Artist in Children if Artist.get_visible() and not Artist.get_animated()}
+        self.BackgroundTexts = {Text:Text.get_text() for Text in self.Ax.texts}
+        for Artist in Children:
+            if Artist.get_animated() and Artist.get_visible():
+                self.Ax.draw_artist(Artist)
+
+    def Draw(self):
+        if not self.Board is None and not self.LowerLeftViewCorner is None and self.CulledState != self.ComponentsState:
+            if self.Visible is None:
+                self.Cull()
+            else:
+                self.CullNew()
+        if self.Coarse:
+            self.UpdateCoarseColors()
+        if self.Background is None:
+            self.Canvas.draw()
+            return
+        Animated = []
+        Changed = []
+        NCached = 0
+        for Artist in self.Ax.get_children():
+            if Artist.get_animated():
+                Animated.append(Artist)
+                continue
+            if not Artist.get_visible():
+                continue
+            if not Artist in self.BackgroundArtists: # Added or shown since the last full draw
+                self.Canvas.draw()
+                return
+            NCached += 1
+            if Artist.stale:
+                if getattr(Artist, 'NeedsFullDraw', False): # Segments layers with erased segments of unknown location
+                    self.Canvas.draw()
+                    return
+                if Artist in self.BackgroundTexts and Artist.get_text() != self.BackgroundTexts[Artist]: # Changed texts extents are not known
+                    self.Canvas.draw()
+                    return
+                Changed.append(Artist)
+        if NCached != len(self.BackgroundArtists): # Removed or hidden artists must be erased from the background
+            self.Canvas.draw()
+            return
+        if len(Changed) > Params.GUI.View.MaxOverlayArtists:
+            self.Canvas.draw()
+            return
+        self.Canvas.restore_region(self.Background)
+        if Changed:
+            self.DrawRegion(Changed)
+        for Artist in Animated:
+            if Artist.get_visible():
+                self.Ax.draw_artist(Artist)
+        self.Canvas.blit(self.Figure.bbox)
+
+    def DrawRegion(self, Changed): # Draws again, from scratch, the region covered by the changed artists, and caches it with the background
+        Renderer = self.Canvas.get_renderer()
+        Boxes = []
+        for Artist in Changed:
+            if hasattr(Artist, 'ChangedExtent'):
+                Box = Artist.ChangedExtent(Renderer)
+            else:
+                Box = Artist.get_window_extent(Renderer)
+            if not Box is None:
+                Boxes.append(Box)
+        if not Boxes:
+            return
+        Box = Bbox.union(Boxes).padded(Params.GUI.View.RegionMargin)
+        Box = Bbox.intersection(Bbox([np.floor(Box.min), np.ceil(Box.max)]), self.Figure.bbox) # Whole pixels, so that each pixel of the region is either kept or fully drawn again
+        if Box is None:
+            return
+        Renderer = ClippedRendererC(Renderer, Box)
+        self.Figure.patch.draw(Renderer) # Same order as a full draw
+        self.Ax.patch.draw(Renderer)
+        for Artist in sorted([Artist for Artist in self.Ax.get_children() if not Artist is self.Ax.patch and not Artist.get_animated()], key = lambda Artist:Artist.get_zorder()):
+            Artist.draw(Renderer)
+        self.Background = self.Canvas.copy_from_bbox(self.Figure.bbox)
+
     def OnMove(self):
         self.UpdateCursorPlot()
         Displacement = np.maximum(0, self.Cursor + Params.GUI.View.DefaultMargin - (self.LowerLeftViewCorner + self.Size))
@@ -507,8 +636,101 @@ class BoardDisplayC:
         self.UpdateCursorPlot()
 
     def SetBoardLimits(self):
+        self.Background = None
         self.Ax.set_xlim(self.LowerLeftViewCorner[0],self.LowerLeftViewCorner[0]+self.xSize)
         self.Ax.set_ylim(self.LowerLeftViewCorner[1],self.LowerLeftViewCorner[1]+self.ySize)
+        self.Cull()
+
+    def Cull(self): # Hides the components out of the view, and shows the ones coming into it. Only components shown at the previous culling, or registered since, are considered
+        if self.Board is None or self.LowerLeftViewCorner is None:
+            return
+        Handler = self.Board.ComponentsHandler
+        Margin = Params.GUI.View.CullMargin
+        LowerLeft, UpperRight = (np.floor(self.LowerLeftViewCorner) - Margin).astype(int), (np.ceil(self.LowerLeftViewCorner + self.Size) + Margin).astype(int)
+        self.CulledWindow = (*LowerLeft.tolist(), *UpperRight.tolist())
+        Visible = Handler.ComponentsInWindow(LowerLeft, UpperRight)
+        if self.Visible is None:
+            Previous = set(Handler.Components.values())
+        else:
+            Previous = self.Visible.union(Handler.Components[ID] for ID in range(self.CulledMaxID+1, Handler.MaxID+1) if ID in Handler.Components)
+        Coarse = self.xSize > Params.GUI.View.LODxSize
+        for Component in Previous.difference(Visible):
+            Component.SetVisible(False)
+        for Component in Visible:
+            Component.SetVisible(True, Coarse)
+        self.Visible = Visible
+        self.CulledMaxID = Handler.MaxID
+        self.CulledState = self.ComponentsState
+        self.Coarse = Coarse
+        self.UpdateCoarsePlots()
+    def CullNew(self): # Culling after components were added or removed, within the same view. Only the components registered since the last culling are placed
+        Handler = self.Board.ComponentsHandler
+        xMin, yMin, xMax, yMax = self.CulledWindow
+        Visible = Handler.ComponentsInWindow((xMin, yMin), (xMax, yMax), MinID = self.CulledMaxID+1)
+        for ID in range(self.CulledMaxID+1, Handler.MaxID+1):
+            Component = Handler.Components.get(ID)
+            if not Component is None and not Component in Visible:
+                Component.SetVisible(False)
+        for Component in Visible:
+            Component.SetVisible(True, self.Coarse)
+        if self.ComponentsState[1] - self.CulledState[1] != Handler.MaxID - self.CulledMaxID: # Some components were removed
+            self.Visible = {Component for Component in self.Visible if not Component.State.Removed}
+        self.Visible.update(Visible)
+        self.CulledMaxID = Handler.MaxID
+        self.CulledState = self.ComponentsState
+        self.UpdateCoarsePlots()
+
+    @property
+    def ComponentsState(self):
+        return (self.Board.ComponentsHandler.MaxID, len(self.Board.ComponentsHandler.Components))
+
+    def UpdateCoarsePlots(self): # Casings rectangles and wires raster of the components within the window of the last culling
+        for Name in ('Casings', 'Wires'):
+            self.Plots[Name].set_visible(self.Coarse)
+        if not self.Coarse:
+            self.CoarseCasings = self.WiresIndices = self.WiresPalette = self.WiresGroups = None
+            return
+        self.CoarseCasings = [Component for Component in self.Visible if Component.CoarsePlot == 'Rectangle']
+        Rectangles = []
+        for Casing in self.CoarseCasings:
+            (x, y), (X, Y) = Casing.SWCorner, Casing.NECorner
+            Rectangles.append(((x, y), (X, y), (X, Y), (x, Y)))
+        self.Plots['Casings'].set_verts(Rectangles)
+        self.CasingsStyles = None
+
+        Handler = self.Board.ComponentsHandler
+        Rastered = [Component for Component in self.Visible if Component.CoarsePlot == 'Raster'] # Pins also advertise directions, but keep their own plots
+        Preferred = np.zeros(Handler.MaxID+1, dtype = bool)
+        Preferred[[Component.ID for Component in Rastered]] = True
+        xMin, yMin, xMax, yMax = self.CulledWindow
+        WiresIDs, Inverse = np.unique(Handler.Map.Raster(*self.CulledWindow, Preferred), return_inverse = True)
+        self.WiresIndices = Inverse.reshape(xMax - xMin + 1, yMax - yMin + 1).T # Images are indexed (y, x)
+        self.WiresPalette = np.zeros((WiresIDs.shape[0], 4))
+        Indices = {ID:nID for nID, ID in enumerate(WiresIDs.tolist())}
+        self.WiresGroups = {} # Group -> ([palette index], [component]) of the rastered components of each group
+        for Component in Rastered:
+            if Component.ID in Indices:
+                GroupIndices, GroupComponents = self.WiresGroups.setdefault(Component.Group, ([], []))
+                GroupIndices.append(Indices[Component.ID])
+                GroupComponents.append(Component)
+        self.WiresLevels = {} # Group -> level of the group when its colors were last computed
+        self.Plots['Wires'].set_extent((xMin - 0.5, xMax + 0.5, yMin - 0.5, yMax + 0.5))
+        self.UpdateCoarseColors()
+    def UpdateCoarseColors(self): # Wires levels may change at each draw. Only the colors of the groups whose level changed are computed again
+        Changed = False
+        for Group, (Indices, Components) in self.WiresGroups.items():
+            if self.WiresLevels.get(Group) == Group.Level:
+                continue
+            self.WiresLevels[Group] = Group.Level
+            for nID, Component in zip(Indices, Components):
+                self.WiresPalette[nID] = to_rgba(Component.Color, Component.Alpha)
+            Changed = True
+        if Changed:
+            self.Plots['Wires'].set_data(self.WiresPalette[self.WiresIndices])
+        Styles = [(Casing.Color, Casing.Alpha) for Casing in self.CoarseCasings]
+        if Styles != self.CasingsStyles:
+            self.CasingsStyles = Styles
+            self.Plots['Casings'].set_color([to_rgba(Color, Alpha) for Color, Alpha in Styles])
 
     def NextZoom(self):
         if self.xSize not in Params.GUI.View.Zooms:
@@ -519,7 +741,7 @@ class BoardDisplayC:
         self.SetBoardLimits()
 
     def UpdateCursorPlot(self):
-        self.Plots['Cursor'].set_data(*self.Cursor)
+        self.Plots['Cursor'].set_data([self.Cursor[0]], [self.Cursor[1]]) # Sequences, as required by recent matplotlib versions
         if Params.GUI.View.CursorLinesWidth:
             self.Plots['HCursor'].set_data([-Params.Board.Max, Params.Board.Max], [self.Cursor[1], self.Cursor[1]])
             self.Plots['VCursor'].set_data([self.Cursor[0], self.Cursor[0]], [-Params.Board.Max, Params.Board.Max])
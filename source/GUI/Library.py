@@ -98,6 +98,9 @@ class CustomBookC(FileSavedEntityC, BookC):
 
         self.CreateComponentsClasses()
 
+    def HeaderCounts(self):
+        return len(self.CList), 0, 0, 0
+
     def AddComponent(self, CDict):
         CName = CDict['CName']
         if CName in self:
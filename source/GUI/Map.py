@@ -0,0 +1,252 @@
+import numpy as np
+
+from Values import Params
+
+# Occupancy indexes of a board. Each cell (x, y) holds a column of 9 component IDs, one per direction theta and the last one for the connexion at this location.
+# Coordinates are not bounded, and memory is only used where components exist.
+
+class ExtentsC: # Number of occupied cells per x and per y coordinate. Limits are updated in O(1), and only recomputed when a boundary line gets empty
+    def __init__(self):
+        self.xCounts = {}
+        self.yCounts = {}
+        self.Bounds = np.zeros((2,2), dtype = int)
+        self.UpToDate = True
+
+    def Add(self, x, y):
+        Empty = not self.xCounts
+        self.xCounts[x] = self.xCounts.get(x, 0) + 1
+        self.yCounts[y] = self.yCounts.get(y, 0) + 1
+        if not self.UpToDate:
+            return
+        if Empty:
+            self.Bounds[:,0] = self.Bounds[:,1] = x, y
+        else:
+            self.Bounds[0,0], self.Bounds[0,1] = min(self.Bounds[0,0], x), max(self.Bounds[0,1], x)
+            self.Bounds[1,0], self.Bounds[1,1] = min(self.Bounds[1,0], y), max(self.Bounds[1,1], y)
+    def Remove(self, x, y):
+        for Counts, Value, Axis in ((self.xCounts, x, 0), (self.yCounts, y, 1)):
+            Counts[Value] -= 1
+            if not Counts[Value]:
+                del Counts[Value]
+                if Value in self.Bounds[Axis]:
+                    self.UpToDate = False
+
+    @property
+    def Limits(self): # ((xMin, xMax), (yMin, yMax)) of occupied cells
+        if not self.UpToDate:
+            if self.xCounts:
+                self.Bounds[0,:] = min(self.xCounts), max(self.xCounts)
+                self.Bounds[1,:] = min(self.yCounts), max(self.yCounts)
+            else:
+                self.Bounds[:] = 0
+            self.UpToDate = True
+        return self.Bounds.copy()
+
+def RasterColumns(Columns, Preferred): # Highest direction ID of each column. IDs flagged in Preferred, a boolean array indexed by ID, are picked first
+    Columns = Columns[...,:8]
+    if Preferred is None:
+        return Columns.max(axis = -1)
+    Keys = Columns.astype(np.int64) | (Preferred[Columns].astype(np.int64) << 32)
+    return (Keys.max(axis = -1) & 0xFFFFFFFF).astype(np.int32)
+
+class HashMapC: # Stores the columns of occupied cells only
+    def __init__(self):
+        self.Cells = {}
+        self.Extents = ExtentsC()
+
+    def Column(self, x, y):
+        Column = self.Cells.get((x, y))
+        if Column is None:
+            return np.zeros(9, dtype = np.int32)
+        return Column.copy()
+    def Get(self, x, y, theta):
+        Column = self.Cells.get((x, y))
+        if Column is None:
+            return 0
+        return int(Column[theta])
+    def Set(self, x, y, theta, ID):
+        Key = (int(x), int(y))
+        Column = self.Cells.get(Key)
+        if Column is None:
+            if not ID:
+                return
+            Column = np.zeros(9, dtype = np.int32)
+            self.Cells[Key] = Column
+            self.Extents.Add(*Key)
+        Column[theta] = ID
+        if not ID and not Column.any():
+            del self.Cells[Key]
+            self.Extents.Remove(*Key)
+
+    def Gather(self, Locations): # IDs at an array of (x, y, theta) locations
+        return np.array([self.Get(x, y, theta) for x, y, theta in np.asarray(Locations).tolist()], dtype = np.int32)
+    def Scatter(self, Locations, ID):
+        for x, y, theta in np.asarray(Locations).tolist():
+            self.Set(x, y, theta, ID)
+
+    def WindowCells(self, xMin, yMin, xMax, yMax): # Yields the location and column of occupied cells of a window, bounds included
+        if (xMax - xMin + 1) * (yMax - yMin + 1) <= len(self.Cells):
+            for x in range(xMin, xMax+1):
+                for y in range(yMin, yMax+1):
+                    if (x, y) in self.Cells:
+                        yield (x, y), self.Cells[(x, y)]
+        else:
+            for (x, y), Column in self.Cells.items():
+                if xMin <= x <= xMax and yMin <= y <= yMax:
+                    yield (x, y), Column
+
+    def Window(self, xMin, yMin, xMax, yMax): # IDs found in the cells of a window, bounds included
+        Columns = [Column for _, Column in self.WindowCells(xMin, yMin, xMax, yMax)]
+        if not Columns:
+            return np.zeros(0, dtype = np.int32)
+        IDs = np.unique(np.concatenate(Columns))
+        return IDs[IDs != 0]
+    def Raster(self, xMin, yMin, xMax, yMax, Preferred = None): # (W, H) array of the highest direction ID of each cell of a window, connexions excluded, see RasterColumns
+        Raster = np.zeros((xMax - xMin + 1, yMax - yMin + 1), dtype = np.int32)
+        for (x, y), Column in self.WindowCells(xMin, yMin, xMax, yMax):
+            Raster[x - xMin, y - yMin] = RasterColumns(Column, Preferred)
+        return Raster
+
+    @property
+    def Limits(self):
+        return self.Extents.Limits
+
+    def __len__(self):
+        return len(self.Cells)
+
+class TiledMapC: # Stores columns in TileSize x TileSize tiles, allocated on first write, with an occupancy bitmap and an occupied cells count per tile
+    TileSize = 64
+    Shift = 6 # log2(TileSize)
+    def __init__(self):
+        self.Tiles = {}
+        self.Occupancy = {}
+        self.Counts = {} # Tiles are freed when their count gets back to 0
+        self.Extents = ExtentsC()
+
+    def Column(self, x, y):
+        Tile = self.Tiles.get((x >> self.Shift, y >> self.Shift))
+        if Tile is None:
+            return np.zeros(9, dtype = np.int32)
+        return Tile[x & (self.TileSize-1), y & (self.TileSize-1)].copy()
+    def Get(self, x, y, theta):
+        Tile = self.Tiles.get((x >> self.Shift, y >> self.Shift))
+        if Tile is None:
+            return 0
+        return int(Tile[x & (self.TileSize-1), y & (self.TileSize-1), theta])
+    def Set(self, x, y, theta, ID): # Single cell path, as used by wires placement. Only the written column is checked
+        x, y = int(x), int(y)
+        Key = (x >> self.Shift, y >> self.Shift)
+        Tile = self.Tiles.get(Key)
+        if Tile is None:
+            if not ID:
+                return
+            Tile = self.NewTile(Key)
+        lx, ly = x & (self.TileSize-1), y & (self.TileSize-1)
+        Tile[lx, ly, theta] = ID
+        Occupied = bool(ID) or bool(Tile[lx, ly].any())
+        Occupancy = self.Occupancy[Key]
+        if Occupied != Occupancy[lx, ly]:
+            Occupancy[lx, ly] = Occupied
+            if Occupied:
+                self.Counts[Key] += 1
+                self.Extents.Add(x, y)
+            else:
+                self.Counts[Key] -= 1
+                self.Extents.Remove(x, y)
+                self.FreeEmptyTile(Key)
+
+    def NewTile(self, Key):
+        Tile = np.zeros((self.TileSize, self.TileSize, 9), dtype = np.int32)
+        self.Tiles[Key] = Tile
+        self.Occupancy[Key] = np.zeros((self.TileSize, self.TileSize), dtype = bool)
+        self.Counts[Key] = 0
+        return Tile
+    def FreeEmptyTile(self, Key):
+        if not self.Counts[Key]:
+            del self.Tiles[Key]
+            del self.Occupancy[Key]
+            del self.Counts[Key]
+
+    def Split(self, Locations): # Yields the tile key and the local (x, y, theta) coordinates of locations, grouped by tile, with their indices
+        Locations = np.asarray(Locations, dtype = np.int64).reshape(-1, 3)
+        if not Locations.shape[0]:
+            return
+        TileKeys = Locations[:,:2] >> self.Shift
+        Local = Locations[:,:2] & (self.TileSize-1)
+        if (TileKeys == TileKeys[0]).all(): # Most components fit in a single tile
+            yield tuple(TileKeys[0].tolist()), slice(None), Local[:,0], Local[:,1], Locations[:,2]
+            return
+        Keys, Inverse = np.unique(TileKeys, axis = 0, return_inverse = True)
+        Inverse = Inverse.reshape(-1)
+        for nKey, (tx, ty) in enumerate(Keys.tolist()):
+            Indices = np.flatnonzero(Inverse == nKey)
+            yield (tx, ty), Indices, Local[Indices,0], Local[Indices,1], Locations[Indices,2]
+    def Gather(self, Locations):
+        IDs = np.zeros(len(Locations), dtype = np.int32)
+        for Key, Indices, lx, ly, theta in self.Split(Locations):
+            Tile = self.Tiles.get(Key)
+            if not Tile is None:
+                IDs[Indices] = Tile[lx, ly, theta]
+        return IDs
+    def Scatter(self, Locations, ID):
+        for Key, Indices, lx, ly, theta in self.Split(Locations):
+            Tile = self.Tiles.get(Key)
+            if Tile is None:
+                if not ID:
+                    continue
+                Tile = self.NewTile(Key)
+            Tile[lx, ly, theta] = ID
+            Occupancy = self.Occupancy[Key]
+            Occupied = Tile[lx, ly].any(axis = 1)
+            Changed = np.flatnonzero(Occupancy[lx, ly] != Occupied)
+            if not Changed.shape[0]:
+                continue
+            Occupancy[lx, ly] = Occupied
+            Cells = set() # Cells written several times, once per direction, are counted once
+            for nCell in Changed.tolist():
+                Cell = (int(lx[nCell]), int(ly[nCell]))
+                if Cell in Cells:
+                    continue
+                Cells.add(Cell)
+                x, y = (Key[0] << self.Shift) + Cell[0], (Key[1] << self.Shift) + Cell[1]
+                if Occupied[nCell]:
+                    self.Counts[Key] += 1
+                    self.Extents.Add(x, y)
+                else:
+                    self.Counts[Key] -= 1
+                    self.Extents.Remove(x, y)
+            self.FreeEmptyTile(Key)
+
+    def WindowBlocks(self, xMin, yMin, xMax, yMax): # Yields the offset to the window lower left corner and the block of columns of each allocated tile overlapping a window, bounds included
+        for tx in range(xMin >> self.Shift, (xMax >> self.Shift) + 1):
+            for ty in range(yMin >> self.Shift, (yMax >> self.Shift) + 1):
+                Tile = self.Tiles.get((tx, ty))
+                if Tile is None:
+                    continue
+                x0, y0 = tx << self.Shift, ty << self.Shift
+                lxMin, lyMin = max(0, xMin - x0), max(0, yMin - y0)
+                yield (x0 + lxMin - xMin, y0 + lyMin - yMin), Tile[lxMin:min(self.TileSize, xMax - x0 + 1), lyMin:min(self.TileSize, yMax - y0 + 1)]
+
+    def Window(self, xMin, yMin, xMax, yMax): # IDs found in the cells of a window, bounds included. Only the tiles overlapping the window are read
+        IDs = [np.unique(Block) for _, Block in self.WindowBlocks(xMin, yMin, xMax, yMax)]
+        if not IDs:
+            return np.zeros(0, dtype = np.int32)
+        IDs = np.unique(np.concatenate(IDs))
+        return IDs[IDs != 0]
+    def Raster(self, xMin, yMin, xMax, yMax, Preferred = None): # (W, H) array of the highest direction ID of each cell of a window, connexions excluded, see RasterColumns
+        Raster = np.zeros((xMax - xMin + 1, yMax - yMin + 1), dtype = np.int32)
+        for (dx, dy), Block in self.WindowBlocks(xMin, yMin, xMax, yMax):
+            Raster[dx:dx+Block.shape[0], dy:dy+Block.shape[1]] = RasterColumns(Block, Preferred)
+        return Raster
+
+    @property
+    def Limits(self):
+        return self.Extents.Limits
+
+    def __len__(self):
+        return sum(self.Counts.values())
+
+Backends = {'Hash':HashMapC,
+            'Tiled':TiledMapC}
+def NewMap():
+    return Backends[Params.Board.MapBackend]()
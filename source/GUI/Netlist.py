@@ -0,0 +1,502 @@
+import numpy as np
+import pickle
+from collections import deque
+
+from Values import Params, Levels, Gates
+from Console import LogWarning
+
+def CSR(Rows, NRows): # Returns the (Start, Items) compressed rows of items, item i belonging to row Rows[i]
+    Rows = np.asarray(Rows, dtype = np.int32)
+    Start = np.zeros(NRows+1, dtype = np.int32)
+    np.cumsum(np.bincount(Rows, minlength = NRows), out = Start[1:])
+    return Start, np.argsort(Rows, kind = 'stable').astype(np.int32)
+
+def PackLanes(Bits): # Packs an array of bits into uint64 words, vector k being held by bit k%64 of word k//64
+    Bytes = np.packbits(np.asarray(Bits, dtype = np.uint8), bitorder = 'little')
+    return np.pad(Bytes, (0, -len(Bytes) % 8)).view('<u8')
+def UnpackLanes(Words, N):
+    return np.unpackbits(Words.view(np.uint8), bitorder = 'little')[:N]
+
+def NativeRun(Code, NInputs): # Scalar rule of a builtin gate over an input word, as evaluated by EvaluateLanes
+    if Code == Gates.Low:
+        return lambda Word: 0
+    if Code == Gates.High:
+        return lambda Word: 1
+    if Code == Gates.Not:
+        return lambda Word: (~Word) & 0b1
+    if Code == Gates.PullDown:
+        return lambda Word: Word & 0b1
+    if Code == Gates.And:
+        Mask = (1 << NInputs) - 1
+        return lambda Word: int(Word == Mask)
+    if Code == Gates.Or:
+        return lambda Word: int(Word != 0)
+    if Code == Gates.XOr:
+        return lambda Word: bin(Word).count('1') & 0b1
+    raise ValueError(f"No native rule for gate code {Code}")
+
+WorkerNetlist, WorkerMemos, WorkerStop = None, None, None
+def StartTruthTableWorker(Data, Stop): # Each worker unpickles the compiled netlist once, and keeps the cancellation flag
+    global WorkerNetlist, WorkerMemos, WorkerStop
+    import Library # Resolves the circular imports of the GUI modules, before unpickling the truth tables of inner boards
+    WorkerNetlist, WorkerStop = pickle.loads(Data), Stop
+    WorkerMemos = [{} for _ in range(WorkerNetlist.NGates)]
+def ComputeTruthTableChunk(Start, End): # Returns the outputs and outputs validities of the inputs computed, that are short of the chunk if cancelled
+    Outputs, OutputValid = [], []
+    for BlockStart in range(Start, End, Params.Board.LanesBlockSize):
+        if WorkerStop.is_set():
+            break
+        Data, _, Valid = WorkerNetlist.RunBatch(np.arange(BlockStart, min(End, BlockStart + Params.Board.LanesBlockSize), dtype = np.int64), WorkerMemos)
+        Outputs.append(Data)
+        OutputValid.append(Valid)
+    if not Outputs:
+        return Start, np.zeros(0, dtype = np.int64), np.zeros(0, dtype = np.int64)
+    return Start, np.concatenate(Outputs), np.concatenate(OutputValid)
+
+class SettleStatsC: # Work done while settling a board, either through its components or its compiled netlist
+    def __init__(self):
+        self.Events = 0 # Evaluation requests received, duplicates included
+        self.Evaluations = 0 # Gates actually evaluated
+        self.Depth = 0 # Length of the longest chain of evaluations
+    def __repr__(self):
+        return f"{self.Events} events, {self.Evaluations} evaluations, depth {self.Depth}"
+
+class NetlistC:
+    # Flat representation of a settled board. Groups are lowered to nets, casings to gates, and levels setters (casings output pins and board input pins) to drivers.
+    # Evaluation only works on these tables. Levels are written back to the drawing objects through Sync.
+    # With Params.Board.FlattenHierarchy, casings running an inner board are inlined : the inner board pins groups are merged with the nets of the casing pins.
+    # Otherwise they are evaluated through their board, that gives the full levels of its outputs so that undefined levels propagate across hierarchy boundaries.
+    def __init__(self, Handler, Flatten = None):
+        self.Handler = Handler
+        if Flatten is None:
+            Flatten = Params.Board.FlattenHierarchy
+
+        Roots = [] # Union-find over raw nets, as inlined boards merge groups of different boards
+        def Find(nNet):
+            while Roots[nNet] != nNet:
+                Roots[nNet] = Roots[Roots[nNet]]
+                nNet = Roots[nNet]
+            return nNet
+
+        RawGroups = [] # (Raw net, group) for groups of the compiled board
+        self.Casings = [] # Gate ID -> casing
+        self.Drivers = [] # Driver ID -> pin, None for drivers of inlined boards
+        SyncPins = [] # (Pin, raw net) for outputs of inlined casings, whose setter level is the net level
+        GateCodes, GateUndefRun, self.Runs, self.Boards = [], [], [], []
+        GateInputNets, GateInputsStart, GateOutputsStart = [], [0], [0]
+        DriverNets = []
+        def AddBoard(BoardHandler, PinNets, Top): # PinNets holds the raw nets of the casing pins an inner board is inlined into, inputs first
+            NetOf = {}
+            def Net(Group):
+                if not Group in NetOf:
+                    NetOf[Group] = len(Roots)
+                    Roots.append(len(Roots))
+                return NetOf[Group]
+            if Top:
+                for Group in BoardHandler.Groups.values():
+                    RawGroups.append((Net(Group), Group))
+            else:
+                for Pin, nNet in zip(tuple(BoardHandler.InputPins) + tuple(BoardHandler.OutputPins), PinNets):
+                    Roots[Find(Net(Pin.Group))] = Find(nNet)
+            for Casing in sorted(BoardHandler.Casings, key = lambda Casing: Casing.ID):
+                if Flatten and Casing.GateCode is None and not Casing.Board is None:
+                    OutputNets = [Net(Pin.Group) for Pin in Casing.OutputPins]
+                    if Top:
+                        SyncPins.extend(zip(Casing.OutputPins, OutputNets))
+                    AddBoard(Casing.Board.ComponentsHandler, [Net(Pin.Group) for Pin in Casing.InputPins] + OutputNets, False)
+                    continue
+                self.Casings.append(Casing)
+                GateUndefRun.append(bool(Casing.UndefRun))
+                if not Casing.GateCode is None: # Builtin gates are evaluated natively rather than through their callback
+                    GateCodes.append(Casing.GateCode)
+                    self.Runs.append(NativeRun(Casing.GateCode, len(Casing.InputPins)))
+                elif not Casing.Board is None:
+                    GateCodes.append(Gates.Board)
+                    self.Runs.append(Casing.Run)
+                else:
+                    GateCodes.append(Gates.Callback)
+                    self.Runs.append(Casing.Run)
+                self.Boards.append(Casing.Board)
+                for Pin in Casing.InputPins:
+                    GateInputNets.append(Net(Pin.Group))
+                GateInputsStart.append(len(GateInputNets))
+                for Pin in Casing.OutputPins: # Output drivers of a gate are contiguous
+                    DriverNets.append(Net(Pin.Group))
+                    self.Drivers.append(Pin if Top else None)
+                GateOutputsStart.append(len(DriverNets))
+            if Top:
+                return [Net(Pin.Group) for Pin in BoardHandler.InputPins], [Net(Pin.Group) for Pin in BoardHandler.OutputPins]
+        InputNets, OutputNets = AddBoard(Handler, None, True)
+        self.InputDrivers = np.arange(len(DriverNets), len(DriverNets) + len(Handler.InputPins), dtype = np.int32)
+        for Pin, nNet in zip(Handler.InputPins, InputNets):
+            DriverNets.append(nNet)
+            self.Drivers.append(Pin)
+
+        Compressed = {} # Raw net roots -> net ID
+        for nNet in range(len(Roots)):
+            Compressed.setdefault(Find(nNet), len(Compressed))
+        def Net(nRawNet):
+            return Compressed[Find(nRawNet)]
+        self.NNets = len(Compressed)
+        self.Groups = [[] for _ in range(self.NNets)] # Net ID -> groups of the compiled board merged into it
+        for nRawNet, Group in RawGroups:
+            self.Groups[Net(nRawNet)].append(Group)
+        self.SyncPins = {}
+        for Pin, nRawNet in SyncPins:
+            self.SyncPins.setdefault(Net(nRawNet), []).append(Pin)
+        GateInputNets = [Net(nRawNet) for nRawNet in GateInputNets]
+        DriverNets = [Net(nRawNet) for nRawNet in DriverNets]
+        self.InputNets = np.array([Net(nRawNet) for nRawNet in InputNets], dtype = np.int32)
+        self.OutputNets = np.array([Net(nRawNet) for nRawNet in OutputNets], dtype = np.int32)
+
+        self.NGates = len(self.Casings)
+        self.NDrivers = len(DriverNets)
+
+        self.GateCodes = np.array(GateCodes, dtype = np.int8)
+        self.GateUndefRun = np.array(GateUndefRun, dtype = bool)
+        self.GateInputsStart = np.array(GateInputsStart, dtype = np.int32)
+        self.GateInputNets = np.array(GateInputNets, dtype = np.int32)
+        self.GateOutputsStart = np.array(GateOutputsStart, dtype = np.int32)
+        self.DriverNets = np.array(DriverNets, dtype = np.int32)
+        self.NetDriversStart, self.NetDrivers = CSR(self.DriverNets, self.NNets)
+        self.NetGatesStart, Entries = CSR(self.GateInputNets, self.NNets) # Fan-out, through the gates input entries
+        self.NetGates = np.repeat(np.arange(self.NGates, dtype = np.int32), np.diff(self.GateInputsStart))[Entries]
+
+        # Python lists mirror the tables for the scalar event loop, as numpy scalar indexing is slow
+        self._GateInputsStart = self.GateInputsStart.tolist()
+        self._GateInputNets = self.GateInputNets.tolist()
+        self._GateOutputsStart = self.GateOutputsStart.tolist()
+        self._GateCodes = self.GateCodes.tolist()
+        self._GateUndefRun = self.GateUndefRun.tolist()
+        self._DriverNets = self.DriverNets.tolist()
+        self._NetDriversStart = self.NetDriversStart.tolist()
+        self._NetDrivers = self.NetDrivers.tolist()
+        self._NetGatesStart = self.NetGatesStart.tolist()
+        self._NetGates = self.NetGates.tolist()
+        self._InputDrivers = self.InputDrivers.tolist()
+        self._InputNets = self.InputNets.tolist()
+        self._OutputNets = self.OutputNets.tolist()
+
+        self.NetLevels = bytearray((Groups[0].Level if Groups else Levels.Undef) for Groups in self.Groups)
+        self.DriverLevels = bytearray((Levels.Undef if Pin is None else Pin.Group.SetBy.get(Pin, Levels.Undef)) for Pin in self.Drivers)
+        self.ChangedNets = set(range(self.NNets)) # Nets to write back onto the groups at next sync
+        self.Queue = deque()
+        self.Dirty = bytearray(self.NGates)
+
+        self.Levelize()
+        self.Buckets = [[] for _ in range(self.NRanks)] # Pending gates per rank, for acyclic boards
+        self.MinPendingRank = self.NRanks
+        self.NPending = 0
+        self.Stats = SettleStatsC()
+
+        for nNet in range(self.NNets):
+            self.ResolveNet(nNet)
+        for nGate in range(self.NGates):
+            self.Request(nGate)
+        self.Settle()
+
+    def Levelize(self): # Gates ranks in topological order. Ranks is None if the netlist contains a loop
+        Successors = []
+        NDrivers = [0 for _ in range(self.NGates)]
+        for nGate in range(self.NGates):
+            GateSuccessors = set()
+            for nDriver in range(self._GateOutputsStart[nGate], self._GateOutputsStart[nGate+1]):
+                nNet = self._DriverNets[nDriver]
+                GateSuccessors.update(self._NetGates[self._NetGatesStart[nNet]:self._NetGatesStart[nNet+1]])
+            for nSuccessor in GateSuccessors:
+                NDrivers[nSuccessor] += 1
+            Successors.append(GateSuccessors)
+        Ranks = [0 for _ in range(self.NGates)]
+        Current = [nGate for nGate in range(self.NGates) if NDrivers[nGate] == 0]
+        NRanked, Rank = 0, 0
+        while Current:
+            Next = []
+            for nGate in Current:
+                Ranks[nGate] = Rank
+                for nSuccessor in Successors[nGate]:
+                    NDrivers[nSuccessor] -= 1
+                    if NDrivers[nSuccessor] == 0:
+                        Next.append(nSuccessor)
+            NRanked += len(Current)
+            Current = Next
+            Rank += 1
+        if NRanked == self.NGates:
+            self.Ranks = np.array(Ranks, dtype = np.int32)
+            self._Ranks = Ranks
+            self.NRanks = Rank
+            self.RankOrder = np.argsort(self.Ranks, kind = 'stable').tolist()
+        else:
+            self.Ranks = None
+            self._Ranks = None
+            self.NRanks = 0
+            self.RankOrder = None
+    @property
+    def Acyclic(self):
+        return not self.Ranks is None
+
+    def Request(self, nGate):
+        self.Stats.Events += 1
+        if self.Dirty[nGate]:
+            return
+        self.Dirty[nGate] = 1
+        if self._Ranks is None:
+            self.Queue.append(nGate)
+        else:
+            Rank = self._Ranks[nGate]
+            self.Buckets[Rank].append(nGate)
+            self.MinPendingRank = min(self.MinPendingRank, Rank)
+            self.NPending += 1
+
+    def ResolveNet(self, nNet): # Same rule as GroupC.SetLevel : undefined without setter, multiple with several setters
+        Start, End = self._NetDriversStart[nNet], self._NetDriversStart[nNet+1]
+        if End == Start:
+            Level = Levels.Undef
+        elif End == Start+1:
+            Level = self.DriverLevels[self._NetDrivers[Start]]
+        else:
+            Level = Levels.Multiple
+        if Level == self.NetLevels[nNet]:
+            return
+        self.NetLevels[nNet] = Level
+        for nGate in self._NetGates[self._NetGatesStart[nNet]:self._NetGatesStart[nNet+1]]:
+            self.Request(nGate)
+
+    def SetDriver(self, nDriver, Level):
+        if self.DriverLevels[nDriver] == Level:
+            return
+        self.DriverLevels[nDriver] = Level
+        nNet = self._DriverNets[nDriver]
+        self.ChangedNets.add(nNet)
+        self.ResolveNet(nNet)
+
+    def EvaluateGate(self, nGate): # Same rule as CasedComponentC.__call__
+        NetLevels = self.NetLevels
+        Start, End = self._GateOutputsStart[nGate], self._GateOutputsStart[nGate+1]
+        Word = 0
+        for nPin, nNet in enumerate(self._GateInputNets[self._GateInputsStart[nGate]:self._GateInputsStart[nGate+1]]):
+            Level = NetLevels[nNet]
+            if (Level >> 1) and not self._GateUndefRun[nGate]:
+                for nDriver in range(Start, End):
+                    self.SetDriver(nDriver, Levels.Undef)
+                return
+            Word |= (Level & 0b1) << nPin
+        if self._GateCodes[nGate] == Gates.Board:
+            for nDriver, Level in zip(range(Start, End), self.Boards[nGate].EvaluateLevels(Word)):
+                self.SetDriver(nDriver, Level)
+            return
+        OutputLevel = self.Runs[nGate](Word)
+        for nDriver in range(Start, End):
+            self.SetDriver(nDriver, OutputLevel & 0b1)
+            OutputLevel >>= 1
+
+    def Settle(self): # Returns the statistics of the work done since the previous settle
+        Stats = self.Stats
+        if self._Ranks is None:
+            self.SettleQueue(Stats)
+        else:
+            self.SettleRanks(Stats)
+        self.Stats = SettleStatsC()
+        return Stats
+
+    def SettleRanks(self, Stats):
+        Rank = self.MinPendingRank # Gates only request gates of higher ranks, so a single sweep evaluates each pending gate once
+        while self.NPending:
+            Bucket = self.Buckets[Rank]
+            if Bucket:
+                for nGate in Bucket:
+                    self.Dirty[nGate] = 0
+                    self.EvaluateGate(nGate)
+                self.NPending -= len(Bucket)
+                Stats.Evaluations += len(Bucket)
+                Stats.Depth += 1
+                Bucket.clear()
+            Rank += 1
+        self.MinPendingRank = self.NRanks
+
+    def SettleQueue(self, Stats):
+        MaxEvaluations = Params.Board.MaxSettlePasses * max(1, self.NGates)
+        while self.Queue:
+            Stats.Depth += 1
+            for _ in range(len(self.Queue)): # Gates requested during this step are evaluated at the next one
+                nGate = self.Queue.popleft()
+                self.Dirty[nGate] = 0
+                self.EvaluateGate(nGate)
+                Stats.Evaluations += 1
+            if Stats.Evaluations > MaxEvaluations:
+                LogWarning(f"Board did not settle after {Stats.Evaluations} gates evaluations, possible unstable loop")
+                self.Queue.clear()
+                self.Dirty = bytearray(self.NGates)
+                break
+
+    def SetInput(self, Input):
+        for nDriver in self._InputDrivers: # Use of little-endian norm
+            self.SetDriver(nDriver, Input & 0b1)
+            Input >>= 1
+        return self.Settle()
+
+    def State(self): # Levels of all nets and drivers, restored by Restore once the netlist settled. Needed by boards holding a state through loops
+        return bytes(self.NetLevels), bytes(self.DriverLevels)
+    def Restore(self, State): # Nets changed since State are already marked for the next sync
+        self.NetLevels[:], self.DriverLevels[:] = State
+
+    def RunBatch(self, Inputs, Memos = None): # Evaluates an array of input words, as BoardC.RunBatch. Returns the output words, with the inputs and outputs validities
+        Inputs = np.asarray(Inputs, dtype = np.int64)
+        if not self.Acyclic:
+            State = self.State() # Inputs are applied in sequence, and the netlist state is restored afterwards
+            Results = np.zeros((3, Inputs.shape[0]), dtype = np.int64)
+            for nInput, Input in enumerate(Inputs.tolist()):
+                self.SetInput(Input)
+                Results[:,nInput] = self.Output, self.InputValid, self.OutputValid
+            self.Restore(State)
+            return Results[0], Results[1], Results[2]
+        Outputs, InputValid, OutputValid = (np.zeros(Inputs.shape[0], dtype = np.int64) for _ in range(3))
+        if Memos is None:
+            Memos = [{} for _ in range(self.NGates)]
+        for Start in range(0, Inputs.shape[0], Params.Board.LanesBlockSize):
+            End = min(Inputs.shape[0], Start + Params.Board.LanesBlockSize)
+            Outputs[Start:End], InputValid[Start:End], OutputValid[Start:End] = self.EvaluateLanes(Inputs[Start:End], Memos)
+        return Outputs, InputValid, OutputValid
+    def EvaluateLevels(self, Input): # Output pins levels, as BoardC.EvaluateLevels
+        self.SetInput(Input)
+        return self.OutputLevels
+
+    def EvaluateLanes(self, Inputs, Memos = None): # Bit-parallel evaluation of an acyclic netlist over an array of input words. Returns the output words and the inputs and outputs validities
+        # Each net holds a value plane (Level & 1) and an invalid plane (Level >> 1), 64 vectors per uint64 word. Builtin gates reduce to a bitwise operation,
+        # while other gates are called once per distinct input word, through Memos that may be shared between successive calls.
+        if self.RankOrder is None:
+            raise ValueError("Bit-parallel evaluation requires an acyclic netlist")
+        Inputs = np.asarray(Inputs, dtype = np.int64)
+        N = Inputs.shape[0]
+        Zeros = np.zeros((N+63)//64, dtype = np.uint64)
+        Ones = ~Zeros
+        if Memos is None:
+            Memos = [{} for _ in range(self.NGates)]
+
+        Values, Invalids = [Zeros for _ in range(self.NNets)], [Ones for _ in range(self.NNets)] # Undriven nets stay undefined
+        for nNet in range(self.NNets):
+            if self._NetDriversStart[nNet+1] - self._NetDriversStart[nNet] > 1:
+                Values[nNet] = Ones # Multiple
+        def Drive(nDriver, Value, Invalid):
+            nNet = self._DriverNets[nDriver]
+            if self._NetDriversStart[nNet+1] - self._NetDriversStart[nNet] == 1:
+                Values[nNet], Invalids[nNet] = Value, Invalid
+
+        for nPin, nDriver in enumerate(self._InputDrivers):
+            Drive(nDriver, PackLanes((Inputs >> nPin) & 0b1), Zeros)
+        for nGate in self.RankOrder:
+            InputNets = self._GateInputNets[self._GateInputsStart[nGate]:self._GateInputsStart[nGate+1]]
+            InputValues = [Values[nNet] for nNet in InputNets]
+            Invalid = Zeros
+            if not self._GateUndefRun[nGate]:
+                for nNet in InputNets:
+                    Invalid = Invalid | Invalids[nNet]
+            Start, End = self._GateOutputsStart[nGate], self._GateOutputsStart[nGate+1]
+            Code = self.GateCodes[nGate]
+            if Code == Gates.Callback or Code == Gates.Board:
+                Words = np.zeros(N, dtype = np.int64)
+                for nPin, Value in enumerate(InputValues):
+                    Words |= UnpackLanes(Value, N).astype(np.int64) << nPin
+                Unique, Inverse = np.unique(Words, return_inverse = True)
+                Memo, Run = Memos[nGate], self.Runs[nGate]
+                Missing = [Word for Word in Unique.tolist() if not Word in Memo] # Memos hold the output word and its validity
+                if Missing and Code == Gates.Board: # Inner boards evaluate all missing words at once
+                    Outputs, _, OutputValid = self.Boards[nGate].RunBatch(np.array(Missing, dtype = np.int64))
+                    Memo.update(zip(Missing, zip(Outputs.tolist(), OutputValid.tolist())))
+                else:
+                    for Word in Missing:
+                        Memo[Word] = (int(Run(Word)), -1)
+                Results = np.array([Memo[Word] for Word in Unique.tolist()], dtype = np.int64).reshape(-1, 2)[Inverse]
+                for nDriver in range(Start, End): # Invalid outputs of inner boards keep their value bit, that tells Multiple from Undef
+                    Bit = nDriver - Start
+                    Drive(nDriver, PackLanes((Results[:,0] >> Bit) & 0b1) & ~Invalid, Invalid | ~PackLanes((Results[:,1] >> Bit) & 0b1))
+                continue
+            if Code == Gates.Low:
+                Value = Zeros
+            elif Code == Gates.High:
+                Value = Ones
+            elif Code == Gates.Not:
+                Value = ~InputValues[0]
+            elif Code == Gates.PullDown:
+                Value = InputValues[0]
+            else:
+                Value = InputValues[0]
+                for Other in InputValues[1:]:
+                    if Code == Gates.And:
+                        Value = Value & Other
+                    elif Code == Gates.Or:
+                        Value = Value | Other
+                    else:
+                        Value = Value ^ Other
+            Drive(Start, Value & ~Invalid, Invalid)
+
+        def Words(Nets, Planes, Invert = False):
+            Result = np.zeros(N, dtype = np.int64)
+            for nPin, nNet in enumerate(Nets):
+                Plane = ~Planes[nNet] if Invert else Planes[nNet]
+                Result |= UnpackLanes(Plane, N).astype(np.int64) << nPin
+            return Result
+        Output = Words(self._OutputNets, Values)
+        InputValid = Words(self._InputNets, Invalids, Invert = True)
+        OutputValid = Words(self._OutputNets, Invalids, Invert = True)
+        return Output, InputValid, OutputValid
+
+    def Sync(self): # Writes nets levels back onto the groups, and updates the components style when needed
+        for nNet in self.ChangedNets:
+            Level = self.NetLevels[nNet]
+            for nDriver in self._NetDrivers[self._NetDriversStart[nNet]:self._NetDriversStart[nNet+1]]:
+                Pin = self.Drivers[nDriver]
+                if not Pin is None:
+                    Pin.Group.SetBy[Pin] = self.DriverLevels[nDriver]
+            for Pin in self.SyncPins.get(nNet, ()):
+                Pin.Group.SetBy[Pin] = Level
+            for Group in self.Groups[nNet]:
+                if Level != Group.Level:
+                    Group.Level = Level
+                    for Component in Group.Components:
+                        Component.UpdateStyle()
+        self.ChangedNets.clear()
+
+    @property
+    def Input(self):
+        Input = 0
+        for nNet in reversed(self._InputNets): # Use of little-endian norm
+            Input = (Input << 1) | (self.NetLevels[nNet] & 0b1)
+        return Input
+    @property
+    def Output(self):
+        Output = 0
+        for nNet in reversed(self._OutputNets):
+            Output = (Output << 1) | (self.NetLevels[nNet] & 0b1)
+        return Output
+    @property
+    def OutputLevels(self):
+        return [self.NetLevels[nNet] for nNet in self._OutputNets]
+    @property
+    def InputValid(self):
+        Valid = 0
+        for nNet in reversed(self._InputNets):
+            Valid = (Valid << 1) | (not (self.NetLevels[nNet] >> 1))
+        return Valid
+    @property
+    def OutputValid(self):
+        Valid = 0
+        for nNet in reversed(self._OutputNets):
+            Valid = (Valid << 1) | (not (self.NetLevels[nNet] >> 1))
+        return Valid
+
+    def __getstate__(self): # Only the tables are pickled, for truth table workers. Drawing objects are dropped, so that syncing a pickled netlist writes nothing
+        State = self.__dict__.copy()
+        for Key in ('Handler', 'Casings', 'Drivers', 'Groups', 'SyncPins'):
+            del State[Key]
+        State['Runs'] = [Casing.CName if Code == Gates.Callback else None for Casing, Code in zip(self.Casings, self._GateCodes)] # Callbacks are lambdas, found back in the standard book
+        State['Boards'] = [None if Board is None else Board.Evaluator for Board in self.Boards]
+        return State
+    def __setstate__(self, State):
+        self.__dict__.update(State)
+        from Library import StandardBook
+        self.Handler, self.Casings, self.Drivers, self.Groups, self.SyncPins = None, [], [None for _ in range(self.NDrivers)], [[] for _ in range(self.NNets)], {}
+        self.Runs = [StandardBook.CClasses[CName].Callback if Code == Gates.Callback else (None if Code == Gates.Board else NativeRun(Code, self._GateInputsStart[nGate+1] - self._GateInputsStart[nGate]))
+                     for nGate, (Code, CName) in enumerate(zip(self._GateCodes, self.Runs))]
+
+    def __repr__(self):
+        return f"Netlist ({self.NNets} nets, {self.NGates} gates, {self.NDrivers} drivers)"
@@ -0,0 +1,184 @@
+import numpy as np
+from weakref import WeakKeyDictionary
+
+from matplotlib.collections import LineCollection
+from matplotlib.transforms import Bbox
+from matplotlib.colors import to_rgba
+from matplotlib import rcParams
+
+# Batched rendering of components lines. Instead of one Line2D per line, each line is a segment of a LineCollection shared by all the lines of an axes with the same linestyle.
+# Colors and widths are held per segment in arrays edited in place, and pushed to the collection when it is drawn.
+# Segments of animated components (see ComponentBase.UpdateAnimated) are moved to a second, animated, collection so that blitting displays only redraw them at each frame.
+# Layers keep the locations of the segments changed since their last draw, so that displays only draw the region they cover again.
+
+class SegmentsCollectionC(LineCollection):
+    def __init__(self, Layer, **kwargs):
+        super().__init__([], **kwargs)
+        self.Layer = Layer
+        self.NeedsFullDraw = False # Set when a segment removed while animated must be erased from the cached background, where its location is not known anymore
+    def ChangedExtent(self, renderer): # Display box of the segments changed since the last draw, at their previous and new locations, padded by their width
+        if not self.Layer.Dirty:
+            return None
+        Points = self.get_transform().transform(np.concatenate(self.Layer.Dirty))
+        Pad = renderer.points_to_pixels(self.Layer.DirtyWidth) / 2
+        return Bbox([Points.min(axis = 0) - Pad, Points.max(axis = 0) + Pad])
+    def draw(self, renderer):
+        self.Layer.Sync()
+        super().draw(renderer)
+        self.NeedsFullDraw = False
+        self.Layer.Dirty = []
+        self.Layer.DirtyWidth = 0.
+
+class SegmentsLayerC:
+    Empty = np.zeros((1,2))
+    def __init__(self, Ax, Linestyle, Animated):
+        self.Collection = SegmentsCollectionC(self, linestyles = Linestyle)
+        self.Collection.set_animated(Animated)
+        Ax.add_collection(self.Collection, autolim = False)
+        self.Segments = []
+        self.Colors = np.zeros((0,4))
+        self.Widths = np.zeros(0)
+        self.Free = []
+        self.Changed = False
+        self.Dirty = [] # Points of the segments changed since the collection was last drawn
+        self.DirtyWidth = 0.
+
+    def Add(self, Segment):
+        if self.Free:
+            nSlot = self.Free.pop()
+        else:
+            nSlot = len(self.Segments)
+            self.Segments.append(self.Empty)
+            if nSlot == self.Colors.shape[0]: # Arrays capacity is doubled when full
+                Size = max(16, 2*nSlot)
+                self.Colors = np.concatenate([self.Colors, np.zeros((Size - nSlot, 4))])
+                self.Widths = np.concatenate([self.Widths, np.zeros(Size - nSlot)])
+        self.Update(nSlot, Segment)
+        return nSlot
+    def Update(self, nSlot, Segment):
+        self.MarkDirty(nSlot)
+        self.Dirty.append(Segment.Points)
+        self.DirtyWidth = max(self.DirtyWidth, Segment.Width)
+        self.Segments[nSlot] = Segment.Points
+        self.Colors[nSlot] = Segment.RGBA
+        self.Widths[nSlot] = Segment.Width
+        self.Changed = True
+        self.Collection.stale = True
+    def Remove(self, nSlot, Erase = True):
+        if Erase: # Segments moved to the animated layer are drawn over their cached version, that needs no erasing
+            self.MarkDirty(nSlot)
+        self.Segments[nSlot] = self.Empty
+        self.Colors[nSlot] = 0
+        self.Widths[nSlot] = 0
+        self.Free.append(nSlot)
+        self.Changed = True
+        self.Collection.stale = True
+
+    def MarkDirty(self, nSlot): # Previous location of a segment, that must be drawn again
+        if not self.Segments[nSlot] is self.Empty:
+            self.Dirty.append(self.Segments[nSlot])
+            self.DirtyWidth = max(self.DirtyWidth, self.Widths[nSlot])
+
+    def Sync(self):
+        if not self.Changed:
+            return
+        N = len(self.Segments)
+        self.Collection.set_segments(self.Segments)
+        self.Collection.set_color(self.Colors[:N])
+        self.Collection.set_linewidth(self.Widths[:N])
+        self.Changed = False
+
+Layers = WeakKeyDictionary() # Axes -> {(Linestyle, Animated) : layer}
+def Layer(Ax, Linestyle, Animated):
+    AxLayers = Layers.setdefault(Ax, {})
+    if not (Linestyle, Animated) in AxLayers:
+        AxLayers[(Linestyle, Animated)] = SegmentsLayerC(Ax, Linestyle, Animated)
+    return AxLayers[(Linestyle, Animated)]
+
+class SegmentC: # Handle on a line of a segments layer, with the Line2D methods used by components
+    def __init__(self, Ax, Xs, Ys, color = None, linestyle = '-', linewidth = None, alpha = None, Animated = False):
+        self.Ax = Ax
+        self.Linestyle = linestyle
+        self.Points = self.ToPoints(Xs, Ys)
+        self.Color = 'k' if color is None else color
+        self.Alpha = alpha
+        self.Width = rcParams['lines.linewidth'] if linewidth is None else linewidth
+        self.RGBA = to_rgba(self.Color, self.Alpha)
+        self.Animated = Animated
+        self.Cached = not Animated # Whether the segment may be part of a cached background
+        self.Visible = True
+        self.Layer = Layer(Ax, self.Linestyle, Animated)
+        self.nSlot = self.Layer.Add(self)
+
+    @staticmethod
+    def ToPoints(Xs, Ys):
+        return np.stack([np.asarray(Xs, dtype = float).reshape(-1), np.asarray(Ys, dtype = float).reshape(-1)], axis = 1)
+    def Update(self):
+        if not self.Layer is None and self.Visible:
+            self.Layer.Update(self.nSlot, self)
+
+    def set_data(self, *args):
+        if len(args) == 1:
+            args = args[0]
+        self.Points = self.ToPoints(*args)
+        self.Update()
+    def set_color(self, Color):
+        self.Color = Color
+        self.RGBA = to_rgba(self.Color, self.Alpha)
+        self.Update()
+    def set_alpha(self, Alpha):
+        self.Alpha = Alpha
+        self.RGBA = to_rgba(self.Color, self.Alpha)
+        self.Update()
+    def set_linewidth(self, Width):
+        self.Width = Width
+        self.Update()
+    def get_linewidth(self):
+        return self.Width
+    def get_alpha(self):
+        return self.Alpha
+    def set_markersize(self, Size): # Segments have no marker
+        pass
+
+    def set_visible(self, Visible): # Hidden segments free their slot
+        if Visible == self.Visible or self.Layer is None:
+            return
+        self.Visible = Visible
+        if Visible:
+            self.nSlot = self.Layer.Add(self)
+            self.Cached = self.Cached or not self.Animated
+        else:
+            self.Layer.Remove(self.nSlot)
+    def get_visible(self):
+        return self.Visible
+
+    def set_animated(self, Animated):
+        if Animated == self.Animated or self.Layer is None:
+            return
+        if self.Visible:
+            self.Layer.Remove(self.nSlot, Erase = False) # Animated segments are drawn over their cached version, that needs no erasing
+        self.Animated = Animated
+        self.Layer = Layer(self.Ax, self.Linestyle, Animated)
+        if self.Visible:
+            self.nSlot = self.Layer.Add(self)
+            self.Cached = self.Cached or not Animated
+    def get_animated(self):
+        return self.Animated
+    @property
+    def stale(self):
+        return not self.Layer is None and self.Layer.Collection.stale
+    @stale.setter
+    def stale(self, Stale):
+        if Stale and not self.Layer is None:
+            self.Layer.Collection.stale = True
+
+    def remove(self):
+        if self.Layer is None:
+            return
+        if self.Visible:
+            self.Layer.Remove(self.nSlot, Erase = not self.Animated)
+        if self.Animated and self.Cached: # Its cached version must be erased as well
+            Static = Layer(self.Ax, self.Linestyle, False).Collection
+            Static.NeedsFullDraw = True
+            Static.stale = True
+        self.Layer = None
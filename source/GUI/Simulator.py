@@ -0,0 +1,131 @@
+import argparse
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+
+import numpy as np
+
+from Library import LibraryHandlerC
+from Board import BoardC
+from Values import Params
+
+# Headless batch runner. Loads a board file, evaluates the input vectors read from a file or stdin, and streams the outputs to stdout.
+# Vectors are written one per line in int, bin (0b...) or hex (0x...), and '#' starts a comment. Outputs are written in the chosen format, one per line.
+# Outputs with invalid bits are followed by the invalid bits mask, within brackets. All logging goes to stderr.
+
+Formats = ('int', 'bin', 'hex')
+
+def FormatWord(Word, NBits, Format): # Same representations as the GUI IntBinHexWidget
+    if Format == 'bin':
+        return format(Word, f'#0{2+NBits}b')
+    if Format == 'hex':
+        return format(Word, f'#0{2+(NBits+3)//4}x')
+    return str(Word)
+def FormatOutput(Output, Valid, NBits, Format):
+    Invalid = ((1 << NBits) - 1) & ~Valid
+    if Invalid:
+        return f"{FormatWord(Output, NBits, Format)} [{FormatWord(Invalid, NBits, Format)}]"
+    return FormatWord(Output, NBits, Format)
+
+def ParseVectors(Lines, NBits): # Yields the input words of the lines given, skipping blank lines and comments
+    for nLine, Line in enumerate(Lines):
+        Line = Line.split('#')[0].strip()
+        if not Line:
+            continue
+        try:
+            Word = int(Line, 0)
+        except ValueError:
+            raise ValueError(f"Line {nLine+1}: unable to read vector {Line}")
+        if Word < 0 or Word >> NBits:
+            raise ValueError(f"Line {nLine+1}: vector {Line} does not fit the {NBits} input bits")
+        yield Word
+
+def Chunks(Words, Size): # Groups an iterable of words in arrays of at most Size words
+    Chunk = []
+    for Word in Words:
+        Chunk.append(Word)
+        if len(Chunk) == Size:
+            yield np.array(Chunk, dtype = np.int64)
+            Chunk = []
+    if Chunk:
+        yield np.array(Chunk, dtype = np.int64)
+
+def LoadBoard(Filename, Profile):
+    Library = LibraryHandlerC()
+    Library.Load(Profile)
+    return BoardC(Filename)
+
+WorkerBoard = None
+def StartWorker(Filename, Profile): # Each worker process loads its own copy of the board
+    global WorkerBoard
+    sys.stdout = sys.stderr
+    WorkerBoard = LoadBoard(Filename, Profile)
+def RunChunk(Inputs):
+    Outputs, _, OutputValid = WorkerBoard.RunBatch(Inputs)
+    return Outputs, OutputValid
+
+def Simulate(Board, InputsChunks, Jobs, Filename, Profile): # Yields each inputs chunk with its outputs and outputs validities, in order
+    if Jobs <= 1:
+        for Inputs in InputsChunks:
+            Outputs, _, OutputValid = Board.RunBatch(Inputs)
+            yield Inputs, Outputs, OutputValid
+        return
+    with ProcessPoolExecutor(Jobs, initializer = StartWorker, initargs = (Filename, Profile)) as Executor:
+        Pending = deque()
+        for Inputs in InputsChunks:
+            Pending.append((Inputs, Executor.submit(RunChunk, Inputs)))
+            if len(Pending) >= 2*Jobs: # Bounded window, so that outputs are streamed while vectors are read
+                Inputs, Future = Pending.popleft()
+                yield (Inputs, *Future.result())
+        while Pending:
+            Inputs, Future = Pending.popleft()
+            yield (Inputs, *Future.result())
+
+def Main(Args = None):
+    Parser = argparse.ArgumentParser(prog = 'pygpu-sim', description = "Runs a board on input vectors, without display")
+    Parser.add_argument('board', help = "board file (.brd)")
+    Parser.add_argument('-i', '--input', default = '-', help = "vectors file, '-' for stdin (default)")
+    Parser.add_argument('-f', '--format', choices = Formats, default = 'int', help = "outputs format (default: int)")
+    Parser.add_argument('-e', '--echo', action = 'store_true', help = "write each input vector before its output")
+    Parser.add_argument('-t', '--truth-table', action = 'store_true', help = "dump the full truth table instead of reading vectors")
+    Parser.add_argument('-j', '--jobs', type = int, default = 1, help = "number of worker processes (default: 1)")
+    Parser.add_argument('-c', '--chunk', type = int, default = Params.Board.LanesBlockSize, help = "vectors evaluated at once by a worker")
+    Parser.add_argument('-p', '--profile', default = LibraryHandlerC.DefaultProfile, help = "library profile holding the books used by the board")
+    Args = Parser.parse_args(Args)
+
+    Out = sys.stdout
+    with redirect_stdout(sys.stderr): # Loading and simulation logs must not mix with the outputs
+        try:
+            Board = LoadBoard(Args.board, Args.profile)
+        except (OSError, ValueError) as e:
+            print(f"Unable to load board {Args.board}: {e}")
+            return 1
+        NInput, NOutput = Board.NBitsInput, Board.NBitsOutput
+        Chunk = max(1, Args.chunk)
+        Source = None
+        try:
+            if Args.truth_table:
+                InputsChunks = (np.arange(Start, min(Start + Chunk, 2**NInput), dtype = np.int64) for Start in range(0, 2**NInput, Chunk))
+            else:
+                Source = sys.stdin if Args.input == '-' else open(Args.input, 'r')
+                InputsChunks = Chunks(ParseVectors(Source, NInput), Chunk)
+            for Inputs, Outputs, OutputValid in Simulate(Board, InputsChunks, Args.jobs, Args.board, Args.profile):
+                Lines = []
+                for Input, Output, Valid in zip(Inputs.tolist(), Outputs.tolist(), OutputValid.tolist()):
+                    Line = FormatOutput(Output, Valid, NOutput, Args.format)
+                    if Args.echo or Args.truth_table:
+                        Line = f"{FormatWord(Input, NInput, Args.format)} {Line}"
+                    Lines.append(Line)
+                Out.write('\n'.join(Lines) + '\n')
+                Out.flush()
+        except (OSError, ValueError) as e:
+            print(e)
+            return 1
+        finally:
+            if not Source is None and not Source is sys.stdin:
+                Source.close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(Main())
@@ -1,5 +1,7 @@
 import numpy as np
 import pickle
+import struct
+from collections import deque
 import os
 import re
 
@@ -13,6 +15,81 @@ LIST = 5
 TUPLE = 6
 REFERENCE = 7
 
+# Columnar files. Objects are stored per LibRef tables, with one column per stored attribute
+FORMAT_MAGIC = b'PyGPUcol'
+FORMAT_VERSION = 3
+# Fixed size header following the magic string and the version : name (truncated) and its full encoded length, components and groups counts, input and output pins counts,
+# then offset and size of the signature, root and tables sections. The signature section holds the (type, name) of each pin in pins order
+FORMAT_HEADER = struct.Struct('<64sHIIHHQQQQQQ')
+FORMAT_NAME_SIZE = 64
+BOOLS = 1
+INTS = 2
+FLOATS = 3
+REFERENCES = 4 # IDs of referenced objects, -1 for None
+ARRAYS = 5 # Arrays of identical shapes and types, stacked
+REFERENCES_CSR = 6 # Sets, lists or tuples of references, as (Type, Start, Items)
+CONSTANT = 7 # Packed value shared by the whole table
+PACKED = 8 # Fallback, one packed value per object, None for missing attributes
+
+def SharedArrays(IDsToDicts): # Identities of the arrays referenced more than once. They are left packed, as pickling keeps them shared while stacking would copy them
+    Seen, Shared = set(), set()
+    Stack = [Value for D in IDsToDicts.values() for Value in D.values()]
+    while Stack:
+        Type, Value = Stack.pop()
+        if Type == ARRAY:
+            if id(Value) in Seen:
+                Shared.add(id(Value))
+            Seen.add(id(Value))
+        elif Type == DICT:
+            Stack.extend(Value.keys())
+            Stack.extend(Value.values())
+        elif Type in (SET, LIST, TUPLE):
+            Stack.extend(Value)
+    return Shared
+
+def PackColumn(Values, Shared):
+    if any(Value is None for Value in Values):
+        return (PACKED, Values)
+    Types = {Value[0] for Value in Values}
+    if Types == {BUILDIN}:
+        Raw = [Value[1] for Value in Values]
+        if all(type(Item) == bool for Item in Raw):
+            return (BOOLS, np.array(Raw, dtype = bool))
+        if all(isinstance(Item, (int, np.integer)) and not isinstance(Item, bool) and -2**63 <= Item < 2**63 for Item in Raw):
+            return (INTS, np.array(Raw, dtype = np.int64))
+        if all(type(Item) == float for Item in Raw):
+            return (FLOATS, np.array(Raw, dtype = float))
+    if Types <= {REFERENCE, BUILDIN} and all((Value[0] == REFERENCE or Value[1] is None) for Value in Values):
+        return (REFERENCES, np.array([(Value[1] if Value[0] == REFERENCE else -1) for Value in Values], dtype = np.int64))
+    if Types == {ARRAY} and len({(Value[1].shape, Value[1].dtype) for Value in Values}) == 1 and Values[0][1].dtype != object and not any(id(Value[1]) in Shared for Value in Values):
+        return (ARRAYS, np.stack([Value[1] for Value in Values]))
+    if len(Types) == 1 and Types <= {SET, LIST, TUPLE} and all(Item[0] == REFERENCE for Value in Values for Item in Value[1]):
+        Start = np.cumsum([0]+[len(Value[1]) for Value in Values], dtype = np.int64)
+        Items = np.array([Item[1] for Value in Values for Item in Value[1]], dtype = np.int64)
+        return (REFERENCES_CSR, (Types.pop(), Start, Items))
+    try:
+        if all(Value == Values[0] for Value in Values[1:]):
+            return (CONSTANT, Values[0])
+    except ValueError: # Ambiguous comparison of nested arrays
+        pass
+    return (PACKED, Values)
+
+def PackTables(IDsToDicts): # Turns packed objects into per LibRef tables of columns
+    Rows = {}
+    for ID, D in IDsToDicts.items():
+        Rows.setdefault(D[(BUILDIN, 'LibRef')][1], []).append((ID, D))
+    Shared = SharedArrays(IDsToDicts)
+    Tables = {}
+    for LibRef, TableRows in Rows.items():
+        Keys = []
+        for _, D in TableRows:
+            for Key in D:
+                if Key != (BUILDIN, 'LibRef') and not Key in Keys:
+                    Keys.append(Key)
+        Tables[LibRef] = {'IDs':np.array([ID for ID, _ in TableRows], dtype = np.int64),
+                          'Columns':{Key:PackColumn([D.get(Key) for _, D in TableRows], Shared) for Key in Keys}}
+    return Tables
+
 class Meta(type):
     # This metaclass allows every storage item to start their init from StorageItem.__init__
     # This method decides if it is a regular instanciation, or data from loaded values, and calls the corresponding methods.
@@ -70,43 +147,74 @@ class StorageItem(metaclass = Meta):
         return D
 
     def Pack(self, Value, IDsToDicts, Packed, NewItem = False, LogTab = 0):
-        IterableTab = 1
-        NewObjectTab = 2
-        if NewItem:
-            D = {}
-            if self.LibRef is None:
-                raise ValueError(f"Unassigned LibRef for {self}")
-            for Key in self._SA:
-                self.Log(f"Saving data in {Key}", LogTab+IterableTab)
-                D[self.Pack(Key, IDsToDicts, Packed, False, LogTab+IterableTab)] = self.Pack(getattr(self, Key), IDsToDicts, Packed, False, LogTab+IterableTab)
-            if self._StoreTmpAttributes:
-                for Key, DefaultValue in self._TA.items():
-                    self.Log(f"Saving default attribute {Key}", LogTab)
-                    D[Key] = self.Pack(DefaultValue, IDsToDicts, Packed, False, LogTab+IterableTab) # Class is reinstanciated with the default value
-            return D
-        if isinstance(Value, StorageItem):
-            if Value in Packed:
-                ID = Packed[Value]
-                self.Log(f"Referenced object as ID {ID}", LogTab)
-            else:
-                ID = max(Packed.values()) + 1
-                Packed[Value] = ID
-                self.Log(f"Packing object {Value} as ID {ID}", LogTab)
-                IDsToDicts[ID] = Value.Pack(None, IDsToDicts, Packed, True, LogTab+NewObjectTab)
+        # Iterative serializer. Referenced objects are given the next free ID and packed from a work list, while containers are packed through an explicit stack,
+        # so that deep wires and groups graphs cannot reach the recursion limit. Packed maps objects to IDs, and is expected to be seeded with {None:0}
+        Pending = deque()
+        def Reference(Item):
+            if Item in Packed:
+                self.Log(f"Referenced object as ID {Packed[Item]}", LogTab)
+                return (REFERENCE, Packed[Item])
+            ID = len(Packed) # IDs are allocated in sequence
+            Packed[Item] = ID
+            self.Log(f"Packing object {Item} as ID {ID}", LogTab)
+            Pending.append((Item, ID))
             return (REFERENCE, ID)
-        VType = type(Value)
-        if VType == dict:
-            return (DICT, {self.Pack(VKey, IDsToDicts, Packed, False, LogTab+IterableTab):self.Pack(VValue, IDsToDicts, Packed, False, LogTab+IterableTab) for VKey, VValue in Value.items()})
-        elif VType == tuple:
-            return (TUPLE, tuple([self.Pack(VValue, IDsToDicts, Packed, False, LogTab+IterableTab) for VValue in Value]))
-        elif VType == list:
-            return (LIST, [self.Pack(VValue, IDsToDicts, Packed, False, LogTab+IterableTab) for VValue in Value])
-        elif VType == set:
-            return (SET, [self.Pack(VValue, IDsToDicts, Packed, False, LogTab+IterableTab) for VValue in Value])
-        elif VType == np.ndarray:
-            return (ARRAY, Value)
+
+        if NewItem:
+            Result = self.PackFields(Reference)
         else:
-            return (BUILDIN, Value)
+            Result = self.PackValue(Value, Reference)
+        while Pending:
+            Item, ID = Pending.popleft()
+            IDsToDicts[ID] = Item.PackFields(Reference)
+        return Result
+
+    def PackFields(self, Reference):
+        if self.LibRef is None:
+            raise ValueError(f"Unassigned LibRef for {self}")
+        D = {}
+        for Key in self._SA:
+            self.Log(f"Saving data in {Key}")
+            D[self.PackValue(Key, Reference)] = self.PackValue(getattr(self, Key), Reference)
+        if self._StoreTmpAttributes:
+            for Key, DefaultValue in self._TA.items():
+                self.Log(f"Saving default attribute {Key}")
+                D[Key] = self.PackValue(DefaultValue, Reference) # Class is reinstanciated with the default value
+        return D
+
+    @staticmethod
+    def PackValue(Value, Reference):
+        Stack = [] # Containers being packed, as (Type, Children, PackedChildren). Dicts children alternate keys and values
+        while True:
+            VType = type(Value)
+            if VType in (dict, tuple, list, set):
+                Children = [Item for Pair in Value.items() for Item in Pair] if VType == dict else list(Value)
+                Stack.append((VType, Children, []))
+                Result = None
+            elif isinstance(Value, StorageItem):
+                Result = Reference(Value)
+            elif VType == np.ndarray:
+                Result = (ARRAY, Value)
+            else:
+                Result = (BUILDIN, Value)
+            while Stack:
+                VType, Children, PackedChildren = Stack[-1]
+                if not Result is None:
+                    PackedChildren.append(Result)
+                if len(PackedChildren) < len(Children):
+                    Value = Children[len(PackedChildren)]
+                    break
+                Stack.pop()
+                if VType == dict:
+                    Result = (DICT, {PackedChildren[nItem]:PackedChildren[nItem+1] for nItem in range(0, len(PackedChildren), 2)})
+                elif VType == tuple:
+                    Result = (TUPLE, tuple(PackedChildren))
+                elif VType == list:
+                    Result = (LIST, PackedChildren)
+                else:
+                    Result = (SET, PackedChildren)
+            else:
+                return Result
 
     def Unpack(self, Type, Value, IDsToDicts, Unpacked, NewItem = False, LogTab = 0, KeyName = ''):
         IterableTab = 1
@@ -157,25 +265,116 @@ class StorageItem(metaclass = Meta):
 class FileSavedEntityC(StorageItem):
     def __init__(self, *args, **kwargs):
         self.StoredAttribute('Filename', None)
+    def HeaderCounts(self): # Components and groups counts, input and output pins counts, advertised in the file header
+        return 0, 0, 0, 0
+    def HeaderSignature(self): # (Type, Name) of each pin, advertised in the signature section
+        return ()
     def Save(self):
         Objects = {}
         D = self.Pack(None, Objects, {None:0}, NewItem = True)
-        D['_obj'] = Objects
+        Signature = pickle.dumps(tuple(self.HeaderSignature()), protocol = pickle.HIGHEST_PROTOCOL)
+        Root = pickle.dumps(D, protocol = pickle.HIGHEST_PROTOCOL)
+        Tables = pickle.dumps(PackTables(Objects), protocol = pickle.HIGHEST_PROTOCOL)
+        Name = str(getattr(self, 'Name', '')).encode('utf-8')
+        HeaderEnd = len(FORMAT_MAGIC) + 2 + FORMAT_HEADER.size
+        RootOffset = HeaderEnd + len(Signature)
+        Header = FORMAT_HEADER.pack(Name[:FORMAT_NAME_SIZE], len(Name), *self.HeaderCounts(), HeaderEnd, len(Signature), RootOffset, len(Root), RootOffset + len(Root), len(Tables))
         Saved = False
         with open(self.Filename, 'wb') as f:
-            f.write(pickle.dumps(D))
+            f.write(FORMAT_MAGIC + FORMAT_VERSION.to_bytes(2, 'little') + Header)
+            f.write(Signature)
+            f.write(Root)
+            f.write(Tables)
             Saved = True
             for Item in self._SA:
                 if isinstance(Item, StorageItem):
                     Item.Saved = True
         return Saved
+    @staticmethod
+    def ReadHeader(f): # Returns the format version and the header fields, None for pickled files saved before the columnar format
+        if f.read(len(FORMAT_MAGIC)) != FORMAT_MAGIC:
+            return 0, None
+        Version = int.from_bytes(f.read(2), 'little')
+        if Version != FORMAT_VERSION:
+            raise ValueError(f"File {f.name} was saved with an unsupported format version ({Version})")
+        return Version, FORMAT_HEADER.unpack(f.read(FORMAT_HEADER.size))
+    @classmethod
+    def ReadFile(cls, Filename, RootOnly = False): # Returns the packed root data and the objects tables, or the objects packed dicts for files saved before the columnar format
+        with open(Filename, 'rb') as f:
+            Version, Header = cls.ReadHeader(f)
+            if Version == 0:
+                f.seek(0)
+                Base = dict(pickle.load(f))
+                return Base, None, Base.pop('_obj')
+            RootOffset, RootSize, TablesOffset, TablesSize = Header[-4:]
+            f.seek(RootOffset)
+            Root = pickle.loads(f.read(RootSize))
+            if RootOnly:
+                return Root, None, {}
+            f.seek(TablesOffset)
+            return Root, pickle.loads(f.read(TablesSize)), {}
+    @classmethod
+    def PeekHeader(cls, Filename): # Only reads the header and the signature section. Returns None for pickled files saved before the columnar format
+        with open(Filename, 'rb') as f:
+            Version, Header = cls.ReadHeader(f)
+            if Header is None:
+                return None
+            SignatureOffset, SignatureSize = Header[6:8]
+            f.seek(SignatureOffset)
+            Pins = list(pickle.loads(f.read(SignatureSize)))
+        Name, NameSize, NComponents, NGroups, NInputs, NOutputs = Header[:6]
+        return {'Version'    : Version,
+                'Name'       : Name.rstrip(b'\x00').decode('utf-8', errors = 'ignore') if NameSize <= FORMAT_NAME_SIZE else None, # Truncated names must be read from the root section
+                'NComponents': NComponents,
+                'NGroups'    : NGroups,
+                'NInputs'    : NInputs,
+                'NOutputs'   : NOutputs,
+                'Pins'       : Pins}
+    def UnpackTables(self, Tables):
+        Unpacked = {}
+        for LibRef, Table in Tables.items(): # All objects are created first, so that references can be resolved column by column
+            StoredItemClass = StorageItem.GeneralLibrary[LibRef]
+            for ID in Table['IDs'].tolist():
+                Item = StoredItemClass.__new__(StoredItemClass)
+                Item._Saved = True
+                Unpacked[ID] = Item
+        for LibRef, Table in Tables.items():
+            Items = [Unpacked[ID] for ID in Table['IDs'].tolist()]
+            for Key, (Kind, Data) in Table['Columns'].items():
+                Attribute = self.Unpack(*Key, {}, Unpacked)
+                if Kind in (BOOLS, INTS, FLOATS):
+                    Values = Data.tolist()
+                elif Kind == REFERENCES:
+                    Values = [(Unpacked[ID] if ID >= 0 else None) for ID in Data.tolist()]
+                elif Kind == ARRAYS:
+                    Values = list(Data)
+                elif Kind == REFERENCES_CSR:
+                    Type, Start, IDs = Data
+                    Objects = [Unpacked[ID] for ID in IDs.tolist()]
+                    Container = {SET:set, LIST:list, TUPLE:tuple}[Type]
+                    Start = Start.tolist()
+                    Values = [Container(Objects[Start[nItem]:Start[nItem+1]]) for nItem in range(len(Items))]
+                elif Kind == CONSTANT:
+                    Values = [self.Unpack(*Data, {}, Unpacked) for _ in Items]
+                else:
+                    for Item, Value in zip(Items, Data):
+                        if not Value is None: # Attribute missing for this object
+                            setattr(Item, Attribute, self.Unpack(*Value, {}, Unpacked))
+                    continue
+                for Item, Value in zip(Items, Values):
+                    setattr(Item, Attribute, Value)
+        for Item in Unpacked.values():
+            for Key in Item._SA:
+                if not hasattr(Item, Key):
+                    LogWarning(f"Object {Item.LibRef} ({Item}) missing stored attribute {Key}")
+        return dict(sorted(Unpacked.items())) # Started in IDs order, parents first
     def Load(self):
-        with open(self.Filename, 'rb') as f:
-            self._RawData = pickle.load(f)
+        Base, Tables, IDsToDicts = self.ReadFile(self.Filename)
         print("Start loading data")
-        Base = dict(self._RawData)
-        IDsToDicts = Base.pop('_obj')
-        Unpacked = {}
+        if Tables is None:
+            Unpacked = {}
+        else:
+            Unpacked = self.UnpackTables(Tables)
         
         StoredData = self.Unpack(DICT, Base, IDsToDicts, Unpacked, NewItem = False)
         for ID, Object in Unpacked.items():
@@ -195,12 +394,11 @@ class FileSavedEntityC(StorageItem):
         return True
     @classmethod
     def PeekFile(cls, Filename, Keys):
-        Data = {}
-        with open(Filename, 'rb') as f:
-            RawData = pickle.load(f)
-            for Key in Keys:
-                Data[Key] = RawData[(BUILDIN, Key)]
-        return Data
+        Header = cls.PeekHeader(Filename)
+        if not Header is None and set(Keys) <= {'Name'} and not Header['Name'] is None:
+            return {Key:(BUILDIN, Header[Key]) for Key in Keys}
+        RawData, _, _ = cls.ReadFile(Filename, RootOnly = True)
+        return {Key:RawData[(BUILDIN, Key)] for Key in Keys}
 
 def Log(data, LogTab = 0, Tab = 2):
     print(LogTab*Tab*' '+data)
@@ -26,6 +26,17 @@ class Levels:
     Valid = (Low, High)
     Invalid = (Undef, Multiple)
 
+class Gates: # Gate type codes used by compiled netlists
+    Callback = 0 # Generic python callback
+    Board    = 1 # Inner schematics
+    Low      = 2
+    High     = 3
+    Not      = 4
+    And      = 5
+    Or       = 6
+    XOr      = 7
+    PullDown = 8
+
 class Colors:
     class GUI:
         default = C.grey
@@ -65,6 +76,14 @@ class Params:
         Max = None
         GroupDefaultLevel = Levels.Low
         AllowStableRecursiveLoops = True
+        MaxSettlePasses = 100 # Maximum number of evaluations of each gate when settling a compiled netlist, avoids infinite loops on unstable boards
+        LanesBlockSize = 2**16 # Number of input vectors evaluated at once by the bit-parallel engine
+        RunCacheSize = 4096 # Number of input words memoized by each board used as a component. 0 disables the cache
+        MapBackend = 'Tiled' # Occupancy index of the components locations, see Map.Backends
+        FlattenHierarchy = False # Inlines boards used as components into the compiled netlist of their parent, rather than evaluating them through their own netlist
+        TruthTableJobs = 0 # Worker processes computing truth tables. 0 uses every core, 1 computes within the calling process
+        TruthTableParallelNBits = 16 # Smallest number of input bits for which truth tables are computed by worker processes
+        TruthTableTaskBlocks = 8 # Lanes blocks computed by a worker per task. Workers check for cancellation between blocks
     class GUI:
         Name = 'Logic Gates Simulator'
         DataFolder = '~/Documents/PyGPUFiles/'
@@ -85,6 +104,11 @@ class Params:
             DefaultMargin = 1
             RefLineEvery = 20
             CursorLinesWidth = 1
+            MaxOverlayArtists = 500 # Changed artists drawn again over the cached background before the whole figure is drawn again
+            RegionMargin = 2 # Pixels added around the region of changed artists, for antialiasing
+            CullMargin = 10 # Components are hidden when further than this margin outside the view
+            LODxSize = 150 # Views wider than this draw casings as filled rectangles and wires as an image, without pins details
+            MaxFPS = 60 # Update requests triggered by user actions are gathered and solved at most once per frame
         class CenterPanel:
             BoardMenuWidth = 40
         class RightPanel:
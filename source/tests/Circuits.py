@@ -0,0 +1,103 @@
+from Builder import BoardBuilderC
+from Library import BookC
+from Components import CasedComponentC
+from DefaultLibrary import W, E
+from Values import PinDict
+
+# Small boards shared by the tests. With a casing at (0, 0), two inputs gates have their inputs at (-1, 1) and (-1, 0) and their output at (2, 1),
+# while single input gates have their input at (-1, 0) and their output at (2, 0).
+
+def GateBoard(CName): # Library gate with a board input pin per gate input and a board output pin per gate output
+    Builder = BoardBuilderC()
+    with Builder.Batch():
+        Casing = Builder.Casing(CName, (0, 0))
+        for Pin in Casing.InputPins:
+            x, y = Pin.Location.tolist()
+            Builder.Pin((x-3, y), PinDict.Input)
+            Builder.Wire((x-3, y), (x, y))
+        for Pin in Casing.OutputPins:
+            x, y = Pin.Location.tolist()
+            Builder.Pin((x+3, y), PinDict.Output)
+            Builder.Wire((x, y), (x+3, y))
+    return Builder.Board
+
+def LoopBoard(): # Or gate latching its input through a pull-down on its second input. Output goes high and stays high once input was high
+    Builder = BoardBuilderC()
+    with Builder.Batch():
+        Builder.Casing('Or', (0, 0))
+        Builder.Pin((-4, 1), PinDict.Input)
+        Builder.Wire((-4, 1), (-1, 1))
+        Builder.Pin((8, 1), PinDict.Output)
+        Builder.Wire((2, 1), (8, 1))
+        Builder.Casing('Pull-down', (0, -4))
+        Builder.Path([(4, 1), (4, -2), (-3, -2), (-3, -4), (-1, -4)])
+        Builder.Path([(2, -4), (3, -4), (3, -7), (-5, -7), (-5, 0), (-1, 0)])
+    return Builder.Board
+
+def HalfAdder(): # Inputs a, b. Outputs sum, carry
+    Builder = BoardBuilderC()
+    with Builder.Batch():
+        Builder.Casing('XOr', (0, 0))
+        Builder.Casing('And', (0, -4))
+        Builder.Pin((-6, 1), PinDict.Input)
+        Builder.Wire((-6, 1), (-1, 1))
+        Builder.Path([(-3, 1), (-3, -3), (-1, -3)])
+        Builder.Pin((-6, 0), PinDict.Input)
+        Builder.Wire((-6, 0), (-1, 0))
+        Builder.Path([(-4, 0), (-4, -4), (-1, -4)])
+        Builder.Pin((5, 1), PinDict.Output)
+        Builder.Wire((2, 1), (5, 1))
+        Builder.Pin((5, -3), PinDict.Output)
+        Builder.Wire((2, -3), (5, -3))
+    return Builder.Board
+
+def NotChain(N): # N Not gates in series, between one input and one output pin
+    Builder = BoardBuilderC()
+    with Builder.Batch():
+        Builder.Pin((-4, 0), PinDict.Input)
+        Builder.Wire((-4, 0), (-1, 0))
+        for nGate in range(N):
+            Builder.Casing('Not', (5*nGate, 0))
+            if nGate:
+                Builder.Wire((5*nGate-3, 0), (5*nGate-1, 0))
+        Builder.Pin((5*N+1, 0), PinDict.Output)
+        Builder.Wire((5*N-3, 0), (5*N+1, 0))
+    return Builder.Board
+
+def BoardClass(Board, CName): # Component class running Board, with its inputs on the west side and its outputs on the east side
+    CDict = CasedComponentC.DefinitionDict()
+    CDict['Board'] = Board
+    CDict['InputPinsDef'] = tuple(W(nPin) for nPin in range(Board.NBitsInput))
+    CDict['OutputPinsDef'] = tuple(E(nPin) for nPin in range(Board.NBitsOutput))
+    return BookC.CreateComponentClass(CName, CDict, 'Tests')
+
+def UndefBoard(): # And gate with its second input left unconnected, so that its output is undefined
+    Builder = BoardBuilderC()
+    with Builder.Batch():
+        Builder.Casing('And', (0, 0))
+        Builder.Pin((-4, 1), PinDict.Input)
+        Builder.Wire((-4, 1), (-1, 1))
+        Builder.Pin((5, 1), PinDict.Output)
+        Builder.Wire((2, 1), (5, 1))
+    return Builder.Board
+
+def MultipleBoard(): # High and Low gates driving the same output. Its input is left unconnected
+    Builder = BoardBuilderC()
+    with Builder.Batch():
+        Builder.Pin((-4, 0), PinDict.Input)
+        Builder.Casing('High', (0, 0))
+        Builder.Casing('Low', (0, -4))
+        Builder.Pin((5, 0), PinDict.Output)
+        Builder.Wire((2, 0), (5, 0))
+        Builder.Path([(2, -4), (4, -4), (4, 0)])
+    return Builder.Board
+
+def DrivenInputBoard(): # Input pin also driven by a High gate, so that its net holds multiple levels
+    Builder = BoardBuilderC()
+    with Builder.Batch():
+        Builder.Pin((-4, 0), PinDict.Input)
+        Builder.Wire((-4, 0), (0, 0))
+        Builder.Pin((0, 0), PinDict.Output)
+        Builder.Casing('High', (-10, 0))
+        Builder.Path([(-8, 0), (-8, -2), (-2, -2), (-2, 0)])
+    return Builder.Board
@@ -0,0 +1,16 @@
+import os, sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'GUI'))
+
+import Library # Must be imported before the other modules of the GUI folder, as it resolves their circular imports
+
+import pytest
+
+@pytest.fixture
+def LibraryHandler(tmp_path, monkeypatch): # Library holding the standard book, with its profile written in a temporary folder. Needed to load files
+    monkeypatch.setattr(Library.LibraryHandlerC, 'Folder', f'{tmp_path}/')
+    monkeypatch.setattr(Library.CustomBookC, 'Folder', f'{tmp_path}/')
+    Handler = Library.LibraryHandlerC()
+    Handler.Load('Tests') # First load only creates the profile
+    Handler.Load('Tests')
+    return Handler
@@ -0,0 +1,183 @@
+import numpy as np
+import pytest
+from contextlib import nullcontext
+
+from Values import Params, Levels, PinDict
+from Builder import BoardBuilderC
+
+from Circuits import GateBoard, LoopBoard, HalfAdder, BoardClass, UndefBoard, MultipleBoard, DrivenInputBoard
+
+GateNames = ['And', 'Or', 'XOr', 'Not', 'High', 'Low', 'Pull-down']
+
+@pytest.mark.parametrize('CName', GateNames)
+def test_RunBatchMatchesRun(CName):
+    Board = GateBoard(CName)
+    Inputs = np.arange(2**Board.NBitsInput)
+    Outputs, InputValid, OutputValid = Board.RunBatch(Inputs)
+    Netlist = Board.ComponentsHandler.Netlist
+    for Input, Output in zip(Inputs.tolist(), Outputs.tolist()):
+        assert Output == Board.Run(Input)
+        Netlist.SetInput(Input)
+        assert Output == Netlist.Output
+    assert (InputValid == (1 << Board.NBitsInput) - 1).all()
+    assert (OutputValid == 1).all()
+
+def test_RunBatchOnLoopBoardIsSequential():
+    Board = LoopBoard()
+    Board.Run(0)
+    Outputs, _, _ = Board.RunBatch([0, 1, 0])
+    assert Outputs.tolist() == [0, 1, 1] # Latched once input was high
+    assert Board.Input == 0 # Board state is restored after the batch
+    assert Board.Output == 0
+
+def test_RunBatchLargerThanLanesBlock(monkeypatch):
+    from Values import Params
+    monkeypatch.setattr(Params.Board, 'LanesBlockSize', 64)
+    Board = HalfAdder()
+    Inputs = np.random.default_rng(2).integers(0, 4, 300)
+    Outputs, _, _ = Board.RunBatch(Inputs)
+    assert Outputs.tolist() == [Board.Run(Input) for Input in Inputs.tolist()]
+
+def test_TruthTableLevels():
+    Board = UndefBoard()
+    assert Board.ComputeTruthTable(Jobs = 1)
+    assert [Board.TruthTable.EvaluateLevels(Input) for Input in (0, 1)] == [[Levels.Undef], [Levels.Undef]]
+    Board = MultipleBoard()
+    assert Board.ComputeTruthTable(Jobs = 1)
+    assert Board.TruthTable.EvaluateLevels(0) == [Levels.Multiple]
+
+@pytest.mark.parametrize('Flatten', [False, True])
+@pytest.mark.parametrize('Table', [False, True])
+@pytest.mark.parametrize('Inner', [UndefBoard, MultipleBoard])
+def test_CasingPropagatesInvalidLevels(monkeypatch, Flatten, Table, Inner):
+    monkeypatch.setattr(Params.Board, 'FlattenHierarchy', Flatten)
+    InnerBoard = Inner()
+    if Table:
+        assert InnerBoard.ComputeTruthTable(Jobs = 1)
+    Board = GateBoard(BoardClass(InnerBoard, Inner.__name__))
+    Level = Levels.Undef if Inner is UndefBoard else Levels.Multiple
+    assert Board.OutputPins[0].Level == Level # Settled through the components
+    for Input in (0, 1):
+        Board.Run(Input)
+        assert Board.OutputValid == 0
+        assert Board.OutputLevels == [Level]
+    Outputs, _, OutputValid = Board.RunBatch(np.array([0, 1]))
+    assert OutputValid.tolist() == [0, 0]
+    assert Outputs.tolist() == [Level & 0b1, Level & 0b1]
+
+def test_RunBatchInputValidity():
+    Board = DrivenInputBoard()
+    Simulated = Board.RunBatch(np.array([0, 1]))
+    assert Simulated[1].tolist() == [0, 0]
+    assert Board.ComputeTruthTable(Jobs = 1)
+    FromTable = Board.RunBatch(np.array([0, 1]))
+    for Array, Expected in zip(FromTable, Simulated):
+        assert Array.tolist() == Expected.tolist()
+
+def test_RunSetsBoardInput():
+    Board = HalfAdder()
+    for Input in (1, 3, 3, 2):
+        Output = Board.Run(Input)
+        assert Board.Input == Input
+        assert Board.Output == Output
+        assert Board.OutputLevels == [Output & 0b1, Output >> 1]
+
+def test_EvaluateLevelsCache():
+    Board = HalfAdder()
+    assert Board.EvaluateLevels(3) == (Levels.Low, Levels.High)
+    assert Board.EvaluateLevels(3) == (Levels.Low, Levels.High)
+    assert (Board.RunCache.Hits, Board.RunCache.Misses) == (1, 1)
+    Board = LoopBoard() # Boards holding a state are not cached
+    Board.EvaluateLevels(0)
+    Board.EvaluateLevels(0)
+    assert Board.RunCache.Hits + Board.RunCache.Misses == 0
+
+def test_SetPinIndexClearsCache():
+    Board = HalfAdder()
+    assert Board.ComputeTruthTable(Jobs = 1)
+    Board.TruthTable.UpToDate = False
+    Board.EvaluateLevels(1)
+    Sum, Carry = Board.OutputPins
+    Board.SetPinIndex(Sum, Carry.Index, 'switch') # Carry becomes the first output bit
+    assert not Board.TruthTable.UpToDate
+    assert not Board.RunCache.Data
+    assert Board.Run(1) == 0b10
+    assert Board.EvaluateLevels(1) == (Levels.Low, Levels.High)
+
+def NotRows(Batched): # Rows of Not gates, each with a branch wire, whose input wires are made of collinear parts that get merged
+    Builder = BoardBuilderC()
+    with (Builder.Board.Batch() if Batched else nullcontext()):
+        for nRow in range(3):
+            y = 6*nRow
+            Builder.Pin((-6, y), PinDict.Input)
+            Builder.Wire((-6, y), (-4, y))
+            Builder.Wire((-4, y), (-1, y))
+            for nGate in range(4):
+                Builder.Casing('Not', (5*nGate, y))
+                if nGate:
+                    Builder.Wire((5*nGate-3, y), (5*nGate-1, y))
+                    Builder.Wire((5*nGate-2, y), (5*nGate-2, y+2))
+            Builder.Pin((21, y), PinDict.Output)
+            Builder.Wire((17, y), (21, y))
+    return Builder.Board
+
+def test_BatchMatchesUnbatched():
+    Batched, Unbatched = NotRows(True), NotRows(False)
+    assert Batched.ComponentsHandler.PendingMerges is None
+    Groups = Batched.ComponentsHandler.Groups
+    assert len(Groups) == len(Unbatched.ComponentsHandler.Groups) == 3*5
+    assert sorted(len(Group) for Group in Groups.values()) == sorted(len(Group) for Group in Unbatched.ComponentsHandler.Groups.values())
+    for Input in range(8):
+        assert Batched.Run(Input) == Unbatched.Run(Input) == Input # Even number of Not gates per row
+    for Group in Groups.values():
+        for Component in Group.Components:
+            assert Component.Group is Group
+
+def test_BatchDefersMerges():
+    Builder = BoardBuilderC()
+    Handler = Builder.Board.ComponentsHandler
+    with Builder.Batch():
+        Builder.Pin((-4, 0), PinDict.Input)
+        Builder.Wire((-4, 0), (-2, 0))
+        Builder.Wire((-2, 0), (-2, 3))
+        assert Handler.PendingMerges
+        assert len(Handler.Groups) > 1
+    assert Handler.PendingMerges is None
+    assert len(Handler.Groups) == 1
+
+def test_BatchRemoveAppliesMerges():
+    Builder = BoardBuilderC()
+    Handler = Builder.Board.ComponentsHandler
+    with Builder.Batch():
+        Builder.Pin((-4, 0), PinDict.Input)
+        Builder.Wire((-4, 0), (-2, 0))
+        Branch = Builder.Wire((-2, 0), (-2, 3))
+        Builder.Wire((-2, 3), (0, 3))
+        Builder.Board.Remove({Branch})
+        assert Handler.PendingMerges == []
+    assert len(Handler.Groups) == 2
+
+@pytest.fixture
+def ParallelTables(monkeypatch): # Small truth tables, computed over several workers and tasks
+    monkeypatch.setattr(Params.Board, 'TruthTableParallelNBits', 1)
+    monkeypatch.setattr(Params.Board, 'LanesBlockSize', 1)
+    monkeypatch.setattr(Params.Board, 'TruthTableTaskBlocks', 2)
+
+def InnerBoardGate(Table): # Gate running a half adder, evaluated by workers through the inner board netlist, or through its truth table
+    InnerBoard = HalfAdder()
+    if Table:
+        assert InnerBoard.ComputeTruthTable(Jobs = 1)
+    return GateBoard(BoardClass(InnerBoard, 'Adder'))
+
+@pytest.mark.parametrize('Circuit', [HalfAdder, LoopBoard, UndefBoard, lambda: InnerBoardGate(False), lambda: InnerBoardGate(True)])
+def test_ParallelTruthTable(ParallelTables, Circuit):
+    Board = Circuit()
+    assert Board.ComputeTruthTable(Jobs = 2)
+    Parallel = (Board.TruthTable.Data.tolist(), Board.TruthTable.Valid.tolist())
+    assert Board.ComputeTruthTable(Jobs = 1)
+    assert Parallel == (Board.TruthTable.Data.tolist(), Board.TruthTable.Valid.tolist())
+
+def test_ParallelTruthTableCancel(ParallelTables):
+    Board = HalfAdder()
+    assert not Board.ComputeTruthTable(Jobs = 2, Progress = lambda Done, Total: True)
+    assert not Board.TruthTable.UpToDate
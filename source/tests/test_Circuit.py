@@ -0,0 +1,136 @@
+from Circuit import UpdatesQueueC
+
+from Builder import BoardBuilderC
+from Values import PinDict, Levels
+
+from Circuits import NotChain
+
+class CasingMock:
+    def __init__(self, ID):
+        self.ID = ID
+    def __repr__(self):
+        return f"Casing {self.ID}"
+
+def test_QueueCoalescesDuplicates():
+    Queue = UpdatesQueueC()
+    Casing = CasingMock(0)
+    for _ in range(3):
+        Queue.Push(Casing)
+    assert len(Queue) == 1
+    assert Queue.Pop() is Casing
+    assert not Queue
+    Stats = Queue.EndSettle()
+    assert (Stats.Events, Stats.Evaluations) == (3, 1)
+    assert Queue.EndSettle().Events == 0
+
+def test_QueueFIFOWithoutRanks():
+    Queue = UpdatesQueueC()
+    Casings = [CasingMock(ID) for ID in (3, 1, 2)]
+    for Casing in Casings:
+        Queue.Push(Casing)
+    assert [Queue.Pop() for _ in Casings] == Casings
+
+def test_QueueOrdersByRankThenID():
+    Queue = UpdatesQueueC()
+    Casings = [CasingMock(ID) for ID in range(4)]
+    Queue.SetRanks({Casings[0]:2, Casings[1]:0, Casings[2]:1, Casings[3]:0})
+    for Casing in Casings:
+        Queue.Push(Casing)
+    assert [Queue.Pop().ID for _ in Casings] == [1, 3, 2, 0]
+
+def test_QueueDepths():
+    Queue = UpdatesQueueC()
+    First, Second = CasingMock(0), CasingMock(1)
+    Queue.Push(First)
+    Queue.Pop()
+    Queue.Push(Second) # Requested by the evaluation of First
+    Queue.Pop()
+    assert Queue.EndSettle().Depth == 2
+
+def test_QueueSetRanksDropsRemovedCasings():
+    Queue = UpdatesQueueC()
+    Kept, Removed = CasingMock(0), CasingMock(1)
+    Queue.Push(Kept)
+    Queue.Push(Removed)
+    Queue.SetRanks({Kept:0})
+    assert len(Queue) == 1
+    assert Queue.Pop() is Kept
+
+def test_ComponentsSettleInRankOrder():
+    Board = NotChain(3) # Settled through its components when the build batch ends
+    Handler = Board.ComponentsHandler
+    assert not Handler.Compiled
+    assert Handler.OutputPins[0].Level == 1
+    Handler.Ready = False # Requests are only queued
+    for Casing in Handler.Casings:
+        Handler.CallRequest(Casing)
+    Handler.Ready = True
+    Stats = Handler.SolveRequests()
+    assert Stats.Evaluations == 3
+
+def NotBoard(Bridged): # Input pin wired up to (-2, 0), one cell short of the input of a Not gate, and an output pin on the gate output
+    Builder = BoardBuilderC()
+    with Builder.Batch():
+        Builder.Pin((-6, 0), PinDict.Input)
+        Builder.Wire((-6, 0), (-2, 0))
+        Builder.Casing('Not', (0, 0))
+        Builder.Pin((5, 0), PinDict.Output)
+        Builder.Wire((2, 0), (5, 0))
+        if Bridged:
+            Builder.Wire((-2, 0), (-1, 0))
+    return Builder
+
+def test_MergeSetsReaderLevel():
+    Builder = NotBoard(False)
+    Board = Builder.Board
+    Output = Board.OutputPins[0]
+    assert Output.Level == Levels.Undef
+    Builder.Wire((-2, 0), (-1, 0)) # Input pin group, at low level, is merged with the gate input group
+    assert Output.Level == Levels.High
+    Board.Run(1)
+    assert Board.OutputLevels == [Levels.Low]
+
+def test_SplitUnsetsReaderLevel():
+    Builder = NotBoard(True)
+    Board = Builder.Board
+    assert Board.Run(0) == 1
+    Wire = Board.ComponentsHandler.Components[Board.ComponentsHandler.Map.Get(-1, 0, 4)] # Aligned wires were merged into a single one
+    assert Wire.Location.tolist() == [[-6, 0], [-1, 0]]
+    Board.Remove([Wire])
+    assert Board.OutputPins[0].Level == Levels.Undef
+    assert Board.OutputValid == 0
+    Builder.Wire((-6, 0), (-1, 0))
+    assert Board.Run(1) == 0 and Board.OutputValid == 1
+
+def test_MergeTriggersNewlyConnectedReaders(monkeypatch):
+    Builder = BoardBuilderC()
+    Casing = Builder.Casing('Not', (0, 0))
+    Builder.Wire((-6, 0), (-2, 0)) # Undriven, at the same undefined level as the gate input
+    Handler = Builder.Board.ComponentsHandler
+    Requests = []
+    monkeypatch.setattr(Handler, 'CallRequest', Requests.append)
+    Builder.Wire((-2, 0), (-1, 0))
+    assert Casing in Requests
+
+def test_MergedGroupsAreFound():
+    Builder = BoardBuilderC()
+    Wires = Builder.Path([(x, x % 4) for x in range(0, 40, 2)]) # Zigzag, so that wires are not merged
+    Handler = Builder.Board.ComponentsHandler
+    assert len(Handler.Groups) == 1
+    Group = next(iter(Handler.Groups.values()))
+    for Wire in Wires:
+        assert Wire.Group is Group
+        assert Wire._Group is Group # Compressed on access
+    assert len(Group.Wires) == len(Wires)
+
+def test_SingleEditsAreNotLevelized():
+    Board = NotChain(3)
+    Handler = Board.ComponentsHandler
+    assert Handler.Levelized and not Handler.Ranks is None # Levelized once, when the build batch ended
+    Builder = BoardBuilderC(Board)
+    Builder.Casing('Not', (0, 10))
+    assert not Handler.Levelized and Handler.Ranks is None # Settled in FIFO order, without levelizing the whole board
+    assert not Handler.Compiled
+    with Builder.Batch():
+        Builder.Casing('Not', (0, 20))
+    assert Handler.Levelized and not Handler.Ranks is None
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+matplotlib = pytest.importorskip('matplotlib')
+matplotlib.use('Agg')
+import matplotlib.figure
+import matplotlib.backends.backend_tkagg
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from Board import BoardC
+from Components import ComponentBase
+from Rendering import SegmentC
+
+from Circuits import HalfAdder
+
+class CanvasC(FigureCanvasAgg): # Agg canvas standing for the Tk one, so that displays can be drawn without a screen
+    def __init__(self, Figure, Master = None):
+        super().__init__(Figure)
+    def get_tk_widget(self):
+        return None
+
+@pytest.fixture
+def DisplayedBoard(LibraryHandler, tmp_path, monkeypatch):
+    monkeypatch.setattr(matplotlib.backends.backend_tkagg, 'FigureCanvasTkAgg', CanvasC)
+    from GUITools import BoardDisplayC
+    Display = BoardDisplayC()
+    monkeypatch.setattr(ComponentBase, 'Display', Display.Ax)
+    monkeypatch.setattr(ComponentBase, 'Segment', SegmentC)
+    Board = HalfAdder()
+    assert Board.Save(f'{tmp_path}/Board.brd')
+    return BoardC(Board.Filename, Display)
+
+def test_LevelChangeIsBlitted(DisplayedBoard, monkeypatch):
+    Board, Display = DisplayedBoard, DisplayedBoard.Display
+    Display.Canvas.draw()
+    Display.Draw()
+    Before = np.asarray(Display.Canvas.buffer_rgba()).copy()
+    FullDraws = []
+    Draw = Display.Canvas.draw
+    monkeypatch.setattr(Display.Canvas, 'draw', lambda: FullDraws.append(Draw()))
+    Board.Input = 3
+    Board.ComponentsHandler.SolveRequests()
+    Display.Draw()
+    assert not FullDraws
+    Blitted = np.asarray(Display.Canvas.buffer_rgba()).copy()
+    assert (Blitted != Before).any()
+    Draw()
+    assert (Blitted == np.asarray(Display.Canvas.buffer_rgba())).all()
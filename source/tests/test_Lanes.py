@@ -0,0 +1,39 @@
+import numpy as np
+
+from Netlist import PackLanes, UnpackLanes
+
+from Circuits import HalfAdder, NotChain, UndefBoard
+
+def test_PackLanesRoundTrip():
+    Bits = np.random.default_rng(0).integers(0, 2, 200)
+    Words = PackLanes(Bits)
+    assert Words.dtype == np.uint64 and Words.shape == (4,)
+    assert (UnpackLanes(Words, 200) == Bits).all()
+    assert int(Words[0]) & 0b1 == Bits[0]
+
+def test_LanesMatchScalarEvaluation():
+    Board = HalfAdder()
+    Netlist = Board.ComponentsHandler.Netlist
+    Inputs = np.random.default_rng(1).integers(0, 4, 150) # Spans several words of lanes
+    Outputs, InputValid, OutputValid = Netlist.EvaluateLanes(Inputs)
+    for Input, Output in zip(Inputs.tolist(), Outputs.tolist()):
+        Netlist.SetInput(Input)
+        assert Output == Netlist.Output
+    assert (InputValid == 0b11).all() and (OutputValid == 0b11).all()
+
+def test_TruthTableFromLanes():
+    Board = NotChain(3)
+    assert Board.ComputeTruthTable(Jobs = 1)
+    assert Board.TruthTable.UpToDate
+    assert Board.TruthTable.Data.tolist() == [1, 0]
+    Board = HalfAdder()
+    assert Board.ComputeTruthTable(Jobs = 1)
+    assert Board.TruthTable.Data.tolist() == [0b00, 0b01, 0b01, 0b10]
+
+def test_LanesPropagateUndefinedLevels():
+    Netlist = UndefBoard().ComponentsHandler.Netlist
+    Outputs, InputValid, OutputValid = Netlist.EvaluateLanes(np.array([0, 1]))
+    assert OutputValid.tolist() == [0, 0]
+    for Input in (0, 1):
+        Netlist.SetInput(Input)
+        assert Netlist.OutputValid == 0
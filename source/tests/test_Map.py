@@ -0,0 +1,136 @@
+import numpy as np
+import pytest
+
+from Map import HashMapC, TiledMapC, ExtentsC
+from Values import Params
+
+from Circuits import HalfAdder
+
+def RandomEdits(Seed, N = 400, Span = 300): # Random writes and erasures over a span crossing tiles boundaries and negative coordinates
+    Generator = np.random.default_rng(Seed)
+    Edits = []
+    for _ in range(N):
+        x, y = Generator.integers(-Span, Span, 2).tolist()
+        theta = int(Generator.integers(0, 9))
+        ID = int(Generator.integers(0, 50)) if Generator.random() < 0.7 else 0
+        Edits.append((x, y, theta, ID))
+    return Edits
+
+def Reference(Edits): # Dense reference of the cells content
+    Cells = {}
+    for x, y, theta, ID in Edits:
+        Cells.setdefault((x, y), np.zeros(9, dtype = np.int32))[theta] = ID
+    return {Key:Column for Key, Column in Cells.items() if Column.any()}
+
+@pytest.mark.parametrize('MapClass', [HashMapC, TiledMapC])
+def test_SetGetColumn(MapClass):
+    Edits = RandomEdits(0)
+    Map = MapClass()
+    for x, y, theta, ID in Edits:
+        Map.Set(x, y, theta, ID)
+    Cells = Reference(Edits)
+    assert len(Map) == len(Cells)
+    for (x, y), Column in Cells.items():
+        assert Map.Column(x, y).tolist() == Column.tolist()
+        assert Map.Get(x, y, 3) == Column[3]
+    assert Map.Get(10**6, -10**6, 0) == 0
+
+def test_BackendsAgree():
+    Edits = RandomEdits(1)
+    Hash, Tiled = HashMapC(), TiledMapC()
+    for x, y, theta, ID in Edits:
+        Hash.Set(x, y, theta, ID)
+        Tiled.Set(x, y, theta, ID)
+    Locations = np.array([Edit[:3] for Edit in Edits])
+    for Start, ID in ((0, 7), (1, 0)): # Batched writes
+        Tiled.Scatter(Locations[Start::2], ID)
+        Hash.Scatter(Locations[Start::2], ID)
+    assert Tiled.Gather(Locations).tolist() == Hash.Gather(Locations).tolist()
+    assert len(Tiled) == len(Hash)
+    for Window in ((-300, -300, 300, 300), (-70, -10, 5, 64), (0, 0, 0, 0), (1000, 1000, 1100, 1100)):
+        assert Tiled.Window(*Window).tolist() == Hash.Window(*Window).tolist()
+    assert Tiled.Limits.tolist() == Hash.Limits.tolist()
+
+@pytest.mark.parametrize('MapClass', [HashMapC, TiledMapC])
+def test_WindowMatchesReference(MapClass):
+    Edits = RandomEdits(2)
+    Map = MapClass()
+    for x, y, theta, ID in Edits:
+        Map.Set(x, y, theta, ID)
+    Cells = Reference(Edits)
+    xMin, yMin, xMax, yMax = -100, -50, 20, 130
+    Expected = set()
+    for (x, y), Column in Cells.items():
+        if xMin <= x <= xMax and yMin <= y <= yMax:
+            Expected.update(Column[Column != 0].tolist())
+    assert Map.Window(xMin, yMin, xMax, yMax).tolist() == sorted(Expected)
+
+@pytest.mark.parametrize('Backend', ['Hash', 'Tiled'])
+def test_BoardOnBackend(monkeypatch, Backend):
+    monkeypatch.setattr(Params.Board, 'MapBackend', Backend)
+    Board = HalfAdder()
+    assert type(Board.ComponentsHandler.Map).__name__ == Backend + 'MapC'
+    assert [Board.Run(Input) for Input in range(4)] == [0b00, 0b01, 0b01, 0b10]
+
+def CheckTiles(Map):
+    for Key, Tile in Map.Tiles.items():
+        assert (Map.Occupancy[Key] == Tile.any(axis = 2)).all()
+        assert Map.Counts[Key] == Map.Occupancy[Key].sum() > 0
+
+def test_TiledCounts():
+    Edits = RandomEdits(3)
+    Map = TiledMapC()
+    for x, y, theta, ID in Edits[:200]:
+        Map.Set(x, y, theta, ID)
+    Locations = np.array([Edit[:3] for Edit in Edits[200:]])
+    Map.Scatter(Locations, 5)
+    CheckTiles(Map)
+    Map.Scatter(Locations[::3], 0)
+    CheckTiles(Map)
+    assert len(Map) == sum(Map.Counts.values()) == len(Reference(Edits[:200] + [(x, y, theta, 5) for x, y, theta in Locations.tolist()] + [(x, y, theta, 0) for x, y, theta in Locations[::3].tolist()]))
+    for x, y, theta, _ in Edits: # Erasing everything frees all tiles
+        Map.Set(x, y, theta, 0)
+    assert not Map.Tiles and not Map.Counts and len(Map) == 0
+
+@pytest.mark.parametrize('MapClass', [HashMapC, TiledMapC])
+def test_LimitsFollowEdits(MapClass):
+    Map = MapClass()
+    assert Map.Limits.tolist() == [[0, 0], [0, 0]]
+    Edits = RandomEdits(4, N = 600)
+    for nEdit, (x, y, theta, ID) in enumerate(Edits):
+        Map.Set(x, y, theta, ID)
+        if nEdit % 25 == 0:
+            Cells = np.array(list(Reference(Edits[:nEdit+1])) or [(0, 0)])
+            assert Map.Limits.tolist() == [[Cells[:,0].min(), Cells[:,0].max()], [Cells[:,1].min(), Cells[:,1].max()]]
+    for x, y, theta, _ in Edits:
+        Map.Set(x, y, theta, 0)
+    assert Map.Limits.tolist() == [[0, 0], [0, 0]]
+
+def test_ExtentsBoundaryRemoval():
+    Extents = ExtentsC()
+    for x, y in ((0, 0), (5, -3), (5, 7), (-2, 1)):
+        Extents.Add(x, y)
+    assert Extents.Limits.tolist() == [[-2, 5], [-3, 7]]
+    Extents.Remove(0, 0) # Inner lines, limits are kept
+    assert Extents.UpToDate
+    Extents.Remove(5, 7) # x = 5 is still occupied, y = 7 is not
+    assert Extents.Limits.tolist() == [[-2, 5], [-3, 1]]
+    Extents.Remove(-2, 1)
+    assert Extents.Limits.tolist() == [[5, 5], [-3, -3]]
+
+@pytest.mark.parametrize('MapClass', [HashMapC, TiledMapC])
+def test_RasterPreferredIDs(MapClass):
+    Map = MapClass()
+    Map.Set(0, 0, 2, 5)
+    Map.Set(0, 0, 4, 9)
+    Map.Set(1, 0, 4, 9)
+    Map.Set(2, 0, -1, 12) # Connexions are not rastered
+    assert Map.Raster(0, 0, 2, 0).tolist() == [[9], [9], [0]]
+    Preferred = np.zeros(13, dtype = bool)
+    Preferred[5] = True
+    assert Map.Raster(0, 0, 2, 0, Preferred).tolist() == [[5], [9], [0]]
+
+def test_ComponentsInWindowFromID():
+    Handler = HalfAdder().ComponentsHandler
+    for LowerLeft, UpperRight in (((-10, -10), (10, 10)), ((-2, -1), (1, 2)), ((3, -5), (6, -2))):
+        assert Handler.ComponentsInWindow(LowerLeft, UpperRight, MinID = 1) == Handler.ComponentsInWindow(LowerLeft, UpperRight)
@@ -0,0 +1,80 @@
+import pytest
+
+from Library import StandardBook, BookC
+from Netlist import NetlistC, NativeRun
+from Values import Gates
+import DefaultLibrary
+from Components import CasedComponentC
+from Builder import BoardBuilderC
+
+from Circuits import GateBoard, HalfAdder, LoopBoard, NotChain
+
+GateNames = ['And', 'Or', 'XOr', 'Not', 'High', 'Low', 'Pull-down']
+
+@pytest.mark.parametrize('CName', GateNames)
+def test_NativeRunMatchesCallback(CName):
+    CClass = StandardBook.CClasses[CName]
+    NInputs = len(CClass.InputPinsDef)
+    Run = NativeRun(CClass.GateCode, NInputs)
+    for Word in range(2**NInputs):
+        assert Run(Word) == int(CClass.Callback(Word)) & 0b1
+
+@pytest.mark.parametrize('CName', GateNames)
+def test_GateBoardRun(CName):
+    Board = GateBoard(CName)
+    Callback = StandardBook.CClasses[CName].Callback
+    for Word in range(2**Board.NBitsInput):
+        assert Board.Run(Word) == int(Callback(Word)) & 0b1
+        assert Board.OutputValid == 1
+
+def test_NetlistEvaluatesGateCodesNatively():
+    def Fail(Word):
+        raise AssertionError("Callback of a builtin gate should not be called by the netlist")
+    CDict = CasedComponentC.DefinitionDict()
+    CDict.update(DefaultLibrary.UnpackDef(DefaultLibrary._Definitions[2][1])) # And
+    CDict['Callback'] = Fail
+    CClass = BookC.CreateComponentClass('NativeAnd', CDict, 'Tests')
+    Builder = BoardBuilderC()
+    with Builder.Batch():
+        Builder.Casing(CClass, (0, 0))
+    Netlist = NetlistC(Builder.Board.ComponentsHandler)
+    assert Netlist.GateCodes.tolist() == [Gates.And]
+    assert [Netlist.Runs[0](Word) for Word in range(4)] == [0, 0, 0, 1]
+
+def test_DefinitionDictHasGateCode():
+    assert CasedComponentC.DefinitionDict()['GateCode'] is None
+
+def test_NetlistTables():
+    Board = HalfAdder()
+    Netlist = Board.ComponentsHandler.Netlist
+    assert Netlist.NGates == 2
+    assert Netlist.NNets == 4
+    assert Netlist.NDrivers == 4 # Two gates outputs and two board inputs
+    assert [Board.Run(Word) for Word in range(4)] == [0b00, 0b01, 0b01, 0b10]
+
+def test_RanksFollowTopologicalOrder():
+    Board = NotChain(4)
+    Netlist = Board.ComponentsHandler.Netlist
+    assert Netlist.Acyclic
+    assert Netlist.NRanks == 4
+    for nGate, Casing in enumerate(Netlist.Casings):
+        assert Netlist.Ranks[nGate] == (Casing.Location[0] // 5)
+    assert Board.ComponentsHandler.Levelize() is not None
+
+def test_RankedSettleEvaluatesEachGateOnce():
+    Board = NotChain(4)
+    Netlist = Board.ComponentsHandler.Netlist
+    Netlist.SetInput(0)
+    Stats = Netlist.SetInput(1)
+    assert Stats.Evaluations == Netlist.NGates
+    assert Stats.Depth == Netlist.NRanks
+    assert Netlist.Output == 1
+    assert Netlist.SetInput(1).Evaluations == 0
+
+def test_LoopBoardIsNotRanked():
+    Board = LoopBoard()
+    Netlist = Board.ComponentsHandler.Netlist
+    assert not Netlist.Acyclic
+    assert Netlist.Ranks is None and Netlist.RankOrder is None
+    assert Board.ComponentsHandler.Levelize() is None
+    assert [Board.Run(Word) for Word in (0, 1, 0)] == [0, 1, 1]
@@ -0,0 +1,116 @@
+import sys
+import pickle
+import numpy as np
+import pytest
+
+from Storage import StorageItem, FileSavedEntityC, PackTables, BUILDIN, REFERENCE, LIST, ARRAYS, FORMAT_VERSION
+from Values import PinDict
+from Library import HiddenBook
+from Board import BoardC
+
+from Circuits import HalfAdder, LoopBoard
+
+class NodeC(StorageItem): # Linked list node
+    LibRef = "TestNodeC"
+    def __init__(self, Next = None, Value = 0):
+        self.StoredAttribute('Next', Next)
+        self.StoredAttribute('Value', Value)
+
+def Chain(N):
+    Node = None
+    for Value in range(N):
+        Node = NodeC(Node, Value)
+    return Node
+
+def test_PackDeepChainWithoutRecursion():
+    N = 3 * sys.getrecursionlimit()
+    Head = Chain(N)
+    Objects = {}
+    Root = Head.Pack(None, Objects, {None:0}, NewItem = True)
+    assert sorted(Objects) == list(range(1, N)) # IDs are allocated in sequence
+    Node = Root
+    for _ in range(N-1):
+        Type, ID = Node[(BUILDIN, 'Next')]
+        assert Type == REFERENCE
+        Node = Objects[ID]
+    assert Node[(BUILDIN, 'Next')] == (BUILDIN, None)
+
+def test_PackDeepNestedContainers():
+    Value = []
+    for _ in range(3 * sys.getrecursionlimit()):
+        Value = [Value]
+    Packed = StorageItem.PackValue(Value, None)
+    Depth = 0
+    while Packed[1]:
+        assert Packed[0] == LIST
+        Packed = Packed[1][0]
+        Depth += 1
+    assert Depth == 3 * sys.getrecursionlimit()
+
+class ContainerC(FileSavedEntityC):
+    LibRef = "TestContainerC"
+    def __init__(self, Filename = None):
+        self.StoredAttribute('Nodes', [])
+        self.Filename = Filename
+
+HiddenBook.Advertise(NodeC)
+HiddenBook.Advertise(ContainerC)
+
+def test_SharedArraysStayShared(LibraryHandler, tmp_path):
+    Container = ContainerC(f'{tmp_path}/Shared.tst')
+    Shared = np.arange(3)
+    Container.Nodes = [NodeC(None, Shared), NodeC(None, Shared), NodeC(None, np.arange(3))]
+    assert Container.Save()
+    Loaded = ContainerC(Container.Filename)
+    assert Loaded.Load()
+    Values = [Node.Value for Node in Loaded.Nodes]
+    assert Values[0] is Values[1] and not Values[0] is Values[2]
+    for Value in Values:
+        assert Value.tolist() == [0, 1, 2]
+
+def test_ArraysColumnsAreStacked():
+    Nodes = [NodeC(None, np.full(2, Value)) for Value in range(4)]
+    Objects = {}
+    Packed = {None:0}
+    for Node in Nodes:
+        Node.Pack(Node, Objects, Packed)
+    Columns = PackTables(Objects)[NodeC.LibRef]['Columns']
+    Kind, Data = Columns[(BUILDIN, 'Value')]
+    assert Kind == ARRAYS and Data.shape == (4, 2)
+
+def CheckBoardsMatch(Board, Loaded):
+    assert len(Loaded.ComponentsHandler.Components) == len(Board.ComponentsHandler.Components)
+    assert len(Loaded.ComponentsHandler.Groups) == len(Board.ComponentsHandler.Groups)
+    assert (Loaded.NBitsInput, Loaded.NBitsOutput) == (Board.NBitsInput, Board.NBitsOutput)
+    for Input in range(2**Board.NBitsInput):
+        assert Loaded.Run(Input) == Board.Run(Input)
+        assert Loaded.OutputValid == Board.OutputValid
+
+@pytest.mark.parametrize('Circuit', [HalfAdder, LoopBoard])
+def test_BoardRoundTrip(LibraryHandler, tmp_path, Circuit):
+    Board = Circuit()
+    assert Board.Save(f'{tmp_path}/Board.brd')
+    CheckBoardsMatch(Board, BoardC(Board.Filename))
+
+def test_LoadPickledFormat(LibraryHandler, tmp_path):
+    Board = HalfAdder()
+    Objects = {}
+    Root = Board.Pack(None, Objects, {None:0}, NewItem = True)
+    Filename = f'{tmp_path}/Old.brd'
+    Root['_obj'] = Objects # Pickled dict, objects under the '_obj' key
+    with open(Filename, 'wb') as f:
+        f.write(pickle.dumps(Root))
+    CheckBoardsMatch(Board, BoardC(Filename))
+
+def test_PeekHeader(LibraryHandler, tmp_path):
+    Board = HalfAdder()
+    for Pin, Name in zip(Board.Pins, ('a', 'b', 'sum', 'carry')):
+        Pin.Name = Name
+    assert Board.Save(f'{tmp_path}/Adder.brd')
+    Header = FileSavedEntityC.PeekHeader(Board.Filename)
+    assert Header['Version'] == FORMAT_VERSION
+    assert Header['Name'] == 'Adder'
+    assert (Header['NComponents'], Header['NGroups']) == (len(Board.ComponentsHandler.Components), len(Board.ComponentsHandler.Groups))
+    assert (Header['NInputs'], Header['NOutputs']) == (2, 2)
+    assert Header['Pins'] == [(PinDict.Input, 'a'), (PinDict.Input, 'b'), (PinDict.Output, 'sum'), (PinDict.Output, 'carry')]
+    assert FileSavedEntityC.PeekFile(Board.Filename, {'Name'}) == {'Name':(BUILDIN, 'Adder')}